@@ -0,0 +1,129 @@
+"""Image variants for the page background.
+
+Generates resized WebP (and AVIF, when this Pillow build can write it) plus a
+JPEG/PNG fallback for each source image into static/img/, named by content
+hash so they can be cached forever. That directory belongs to this pipeline:
+files its manifest no longer lists (old hashes, dropped widths or sources)
+are deleted on each build. The rest of static/ is never touched. Streamlit
+serves the folder at app/static/ when server.enableStaticServing is on (see
+.streamlit/config.toml).
+
+Runs on first app start, or ahead of time with: python assets.py
+"""
+import hashlib
+import io
+import json
+import os
+
+from PIL import Image
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(BASE_DIR, "static", "img")
+MANIFEST_PATH = os.path.join(STATIC_DIR, "manifest.json")
+STATIC_URL = "app/static/img"
+
+# source file -> (widths, fallback format)
+SOURCES = {
+    "prayer.png": ((640, 1280, 1920), "JPEG"),
+}
+FORMATS = {"AVIF": "avif", "WEBP": "webp", "JPEG": "jpg", "PNG": "png"}
+QUALITY = {"AVIF": 50, "WEBP": 75, "JPEG": 80}
+
+
+def _file_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _encode(image, fmt):
+    buffer = io.BytesIO()
+    if fmt == "JPEG":
+        image = image.convert("RGB")
+    options = {"quality": QUALITY[fmt]} if fmt in QUALITY else {"optimize": True}
+    image.save(buffer, fmt, **options)
+    return buffer.getvalue()
+
+
+def _build_variants(source, widths, fallback):
+    stem = os.path.splitext(source)[0]
+    variants = []
+    with Image.open(os.path.join(BASE_DIR, source)) as original:
+        original.load()
+        for width in sorted({min(w, original.width) for w in widths}):
+            height = round(original.height * width / original.width)
+            image = original.resize((width, height), Image.LANCZOS)
+            for fmt in ("AVIF", "WEBP", fallback):
+                try:
+                    data = _encode(image, fmt)
+                except (KeyError, OSError, ValueError):
+                    continue  # this Pillow build can't write the format
+                digest = hashlib.sha256(data).hexdigest()[:12]
+                name = f"{stem}-{width}w.{digest}.{FORMATS[fmt]}"
+                path = os.path.join(STATIC_DIR, name)
+                if not os.path.exists(path):
+                    with open(path, "wb") as f:
+                        f.write(data)
+                variants.append({"format": FORMATS[fmt], "width": width, "file": name, "bytes": len(data)})
+    return variants
+
+
+def build_assets():
+    """Build missing or outdated variants and return the manifest."""
+    os.makedirs(STATIC_DIR, exist_ok=True)
+    manifest = {}
+    if os.path.exists(MANIFEST_PATH):
+        with open(MANIFEST_PATH) as f:
+            manifest = json.load(f)
+
+    changed = any(source not in SOURCES for source in manifest)
+    manifest = {source: entry for source, entry in manifest.items() if source in SOURCES}
+    for source, (widths, fallback) in SOURCES.items():
+        source_hash = _file_hash(os.path.join(BASE_DIR, source))
+        entry = manifest.get(source)
+        if entry and entry["source_hash"] == source_hash and all(
+            os.path.exists(os.path.join(STATIC_DIR, v["file"])) for v in entry["variants"]
+        ):
+            continue
+        manifest[source] = {"source_hash": source_hash, "variants": _build_variants(source, widths, fallback)}
+        changed = True
+
+    if changed:
+        with open(MANIFEST_PATH, "w") as f:
+            json.dump(manifest, f, indent=2)
+    _prune(manifest)
+    return manifest
+
+
+def _prune(manifest):
+    """Delete files in static/img/ that the manifest no longer lists."""
+    keep = {v["file"] for entry in manifest.values() for v in entry["variants"]}
+    keep.add(os.path.basename(MANIFEST_PATH))
+    for name in os.listdir(STATIC_DIR):
+        path = os.path.join(STATIC_DIR, name)
+        if name not in keep and os.path.isfile(path):
+            os.remove(path)
+
+
+def background_css(manifest, source="prayer.png", selector="body, .stApp"):
+    """CSS that serves the smallest sufficient background variant per screen width."""
+    variants = manifest[source]["variants"]
+    widths = sorted({v["width"] for v in variants})
+    rules = []
+    for i, width in enumerate(widths):
+        by_format = {v["format"]: f"{STATIC_URL}/{v['file']}" for v in variants if v["width"] == width}
+        fallback = by_format.get("jpg") or by_format.get("png")
+        candidates = [f'url("{by_format[fmt]}") type("image/{fmt}")' for fmt in ("avif", "webp") if fmt in by_format]
+        candidates.append(f'url("{fallback}") type("image/{"jpeg" if fallback.endswith(".jpg") else "png"}")')
+        rule = (f"{selector} {{ background-image: url('{fallback}'); "
+                f"background-image: image-set({', '.join(candidates)}); }}")
+        if i > 0:
+            rule = f"@media (min-width: {widths[i - 1] + 1}px) {{ {rule} }}"
+        rules.append(rule)
+    return "\n".join(rules)
+
+
+if __name__ == "__main__":
+    for source, entry in build_assets().items():
+        print(source)
+        for variant in entry["variants"]:
+            print(f"  {variant['file']:<45} {variant['bytes'] / 1024:8.1f} KB")
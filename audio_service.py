@@ -0,0 +1,182 @@
+"""Prayer Room audio: manifest validation, low-bitrate variants and serving.
+
+At startup prepare_audio() checks every manifest entry exists, links the
+files into static/audio/ and transcodes a low-bitrate copy of each with
+ffmpeg when it is installed. The player then gets a URL instead of file
+bytes, so Streamlit no longer reads the whole file into memory on every rerun
+and the browser can seek with byte-range requests.
+
+URLs point at Streamlit's static serving (app/static/audio/) by default,
+whose file responses honour Range headers. For older Streamlit versions, or
+to offload audio entirely, run the standalone range server and set
+AUDIO_BASE_URL to its public address:
+
+    python audio_service.py --port 8502
+"""
+import argparse
+import logging
+import os
+import re
+import shutil
+import subprocess
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urljoin
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+AUDIO_DIR = os.path.join(BASE_DIR, "static", "audio")
+AUDIO_BASE_URL = os.getenv("AUDIO_BASE_URL")  # e.g. http://host:8502 for the standalone server
+STATIC_AUDIO_PATH = "app/static/audio"
+LOW_BITRATE = "48k"
+CHUNK_SIZE = 64 * 1024
+
+AUDIO_MANIFEST = {
+    "Calm Music": "silent-evening-calm-piano-335749.mp3",
+    "Worship Music": "silent-evening-calm-piano-335749.mp3",
+    "Church Bell": "single-church-bell-2-352062.mp3",
+    "The Lord's Prayer": "audio_The_Lords_Prayer.mp3",
+}
+
+logger = logging.getLogger(__name__)
+
+
+def _low_name(filename):
+    stem, ext = os.path.splitext(filename)
+    return f"{stem}-{LOW_BITRATE}{ext}"
+
+
+def _publish(filename):
+    """Hard-link (or copy) a source file into AUDIO_DIR."""
+    target = os.path.join(AUDIO_DIR, filename)
+    if not os.path.exists(target):
+        try:
+            os.link(os.path.join(BASE_DIR, filename), target)
+        except OSError:
+            shutil.copyfile(os.path.join(BASE_DIR, filename), target)
+
+
+def _transcode(filename):
+    target = os.path.join(AUDIO_DIR, _low_name(filename))
+    if os.path.exists(target):
+        return True
+    if not shutil.which("ffmpeg"):
+        return False
+    result = subprocess.run(
+        ["ffmpeg", "-y", "-loglevel", "error", "-i", os.path.join(BASE_DIR, filename),
+         "-ac", "1", "-b:a", LOW_BITRATE, target],
+        capture_output=True,
+    )
+    if result.returncode != 0:
+        logger.warning("Could not transcode %s: %s", filename, result.stderr.decode(errors="replace"))
+        return False
+    return True
+
+
+def prepare_audio():
+    """Validate the manifest and publish files; returns {name: {"file", "low"}}.
+
+    Entries whose file is missing are left out (and logged) so the UI never
+    offers a track that can't play.
+    """
+    os.makedirs(AUDIO_DIR, exist_ok=True)
+    available = {}
+    for name, filename in AUDIO_MANIFEST.items():
+        if not os.path.isfile(os.path.join(BASE_DIR, filename)):
+            logger.warning("Audio '%s' is unavailable: %s not found", name, filename)
+            continue
+        _publish(filename)
+        available[name] = {"file": filename, "low": _low_name(filename) if _transcode(filename) else None}
+    return available
+
+
+def audio_url(track, page_url=None, low_bitrate=False):
+    """Absolute URL for a track, or None if there is nowhere to serve it from.
+
+    page_url is the app's own URL (st.context.url), used to reach Streamlit's
+    static serving when AUDIO_BASE_URL isn't set.
+    """
+    filename = track["low"] if low_bitrate and track["low"] else track["file"]
+    if AUDIO_BASE_URL:
+        return f"{AUDIO_BASE_URL.rstrip('/')}/{filename}"
+    if page_url:
+        return urljoin(page_url, f"{STATIC_AUDIO_PATH}/{filename}")
+    return None
+
+
+# --- Standalone range server ---
+class AudioRequestHandler(BaseHTTPRequestHandler):
+    """Serves AUDIO_DIR with byte-range support, streaming from disk in chunks."""
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def _serve(self, send_body):
+        filename = os.path.basename(self.path.split("?", 1)[0])
+        path = os.path.join(AUDIO_DIR, filename)
+        if not filename.endswith(".mp3") or not os.path.isfile(path):
+            self.send_error(404)
+            return
+
+        size = os.path.getsize(path)
+        start, end = 0, size - 1
+        match = re.fullmatch(r"bytes=(\d*)-(\d*)", self.headers.get("Range", "").strip())
+        if match and (match.group(1) or match.group(2)):
+            if match.group(1):
+                start = int(match.group(1))
+                end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+            else:
+                start = max(size - int(match.group(2)), 0)
+            if start > end:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        else:
+            self.send_response(200)
+
+        self.send_header("Content-Type", "audio/mpeg")
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.send_header("Cache-Control", "public, max-age=86400")
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+        if not send_body:
+            return
+
+        remaining = end - start + 1
+        with open(path, "rb") as f:
+            f.seek(start)
+            while remaining > 0:
+                chunk = f.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                try:
+                    self.wfile.write(chunk)
+                except (BrokenPipeError, ConnectionResetError):
+                    return  # listener seeked or left
+                remaining -= len(chunk)
+
+    def log_message(self, format, *args):
+        logger.debug(format, *args)
+
+
+def serve(host="0.0.0.0", port=8502):
+    prepare_audio()
+    server = ThreadingHTTPServer((host, port), AudioRequestHandler)
+    server.daemon_threads = True
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve Prayer Room audio with byte-range support.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8502)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    server = serve(args.host, args.port)
+    print(f"🔔 Serving {AUDIO_DIR} on http://{args.host}:{args.port}/")
+    server.serve_forever()
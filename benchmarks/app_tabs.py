@@ -0,0 +1,248 @@
+"""Per-tab rerun latency of app.py against local stand-ins for its services.
+
+Runs entirely offline: one local HTTP server plays the OpenAI chat endpoint
+(streamed and plain), bible-api.com and the RSS feeds, each with its own
+configurable latency. app.py runs through Streamlit's AppTest; for every tab
+the suite records the first render (cold caches), then a series of reruns
+driven the way a user would (a new chat prompt, the next chapter, a plain
+rerun), with wall time, stand-in calls per rerun and Python memory.
+
+Results are JSON, keyed by tab, so two commits can be compared:
+
+    python benchmarks/app_tabs.py --reruns 10 --output bench.json
+    python benchmarks/app_tabs.py --openai-latency 0.3 --rss-latency 0.5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from urllib.parse import unquote
+
+from stand_in import StandInHandler, serve
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FEEDS = ["news-1", "news-2", "news-3"]
+DEVOTIONAL = "devotional"
+
+TABS = [
+    "📖 Bible Chat (Beta)",
+    "📰 Bible News",
+    "📖 Bible Reading Room",
+    "🙏 Prayer Room",
+    "📆 Daily Devotional",
+    "💬 Comments",
+]
+
+
+# --- Stand-in services ---
+class StandIn:
+    def __init__(self, openai_latency, token_delay, bible_latency, rss_latency, items):
+        self.latency = {"openai": openai_latency, "bible": bible_latency, "rss": rss_latency}
+        self.token_delay = token_delay
+        self.items = items
+        self.calls = Counter()
+        self.lock = threading.Lock()
+
+    def count(self, service):
+        with self.lock:
+            self.calls[service] += 1
+        time.sleep(self.latency[service])
+
+    def snapshot(self):
+        with self.lock:
+            return Counter(self.calls)
+
+    def rss(self, name):
+        items = "".join(
+            f"""<item><title>{name} story {i}</title><link>http://example.invalid/{name}/{i}</link>
+            <guid>{name}-{i}</guid><pubDate>Mon, 06 Jan 2025 08:00:00 GMT</pubDate>
+            <description><![CDATA[<p><img src="http://example.invalid/{name}/{i}.jpg"/>
+            {"Grace and peace to you. " * 40}</p>]]></description></item>"""
+            for i in range(self.items)
+        )
+        return f"""<?xml version="1.0"?><rss version="2.0"><channel><title>{name}</title>
+            <link>http://example.invalid/{name}</link><description>stand-in</description>{items}</channel></rss>"""
+
+    def chapter(self, reference):
+        book, _, chapter = reference.rpartition(" ")
+        verses = [{"book_id": book[:3].upper(), "book_name": book, "chapter": int(chapter), "verse": v,
+                   "text": f"Verse {v} of {book} {chapter}, a stand-in line of scripture text.\n"}
+                  for v in range(1, 31)]
+        return {"reference": reference, "verses": verses, "text": "".join(v["text"] for v in verses),
+                "translation_id": "web", "translation_name": "World English Bible"}
+
+
+class Handler(StandInHandler):
+    def do_GET(self):
+        stand_in = self.server.stand_in
+        path = unquote(self.path)
+        if path.startswith("/rss/"):
+            stand_in.count("rss")
+            self.send(200, stand_in.rss(path[5:]).encode(), "application/rss+xml")
+        elif path.startswith("/bible/"):
+            stand_in.count("bible")
+            self.send(200, json.dumps(stand_in.chapter(path[7:])).encode())
+        else:
+            self.send(404, b"{}")
+
+    def do_POST(self):
+        stand_in = self.server.stand_in
+        body = json.loads(self.read_body() or b"{}")
+        if not self.path.endswith("/chat/completions"):
+            self.send(404, b"{}")
+            return
+        stand_in.count("openai")
+        words = ("Peace be with you; the Lord is near to all who call on Him. " * 8).split(" ")
+        if not body.get("stream"):
+            self.send(200, json.dumps(_completion(" ".join(words))).encode())
+            return
+        self.start_chunked()
+        for word in words:
+            time.sleep(stand_in.token_delay)
+            self.send_chunk(f"data: {json.dumps(_chunk(word + ' '))}\n\n".encode())
+        self.send_chunk(f"data: {json.dumps(_chunk(None, 'stop'))}\n\ndata: [DONE]\n\n".encode())
+        self.send_chunk(b"")
+
+
+def _completion(text):
+    return {"id": "cmpl-stand-in", "object": "chat.completion", "created": int(time.time()),
+            "model": "gpt-3.5-turbo", "choices": [{"index": 0, "finish_reason": "stop",
+                                                   "message": {"role": "assistant", "content": text}}],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}}
+
+
+def _chunk(content, finish_reason=None):
+    delta = {"content": content} if content is not None else {}
+    return {"id": "chunk-stand-in", "object": "chat.completion.chunk", "created": int(time.time()),
+            "model": "gpt-3.5-turbo", "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+
+
+# --- Benchmark ---
+def _interaction(at, tab, i):
+    """Drive one rerun of the tab the way a user would."""
+    if tab == TABS[0]:
+        at.chat_input[0].set_value(f"What does the Bible say about hope? ({i})")
+    elif tab == TABS[2]:
+        chapter = at.number_input[0]
+        chapter.set_value(chapter.value % 20 + 1)
+    at.run()
+
+
+def _summary(samples):
+    ordered = sorted(samples)
+    return {
+        "median_ms": round(statistics.median(ordered) * 1000, 2),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2),
+    }
+
+
+def bench_tab(tab, stand_in, reruns, timeout):
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    at = AppTest.from_file(os.path.join(REPO_DIR, "app.py"), default_timeout=timeout)
+    at.run()
+
+    tracemalloc.start()
+    before = stand_in.snapshot()
+    start = time.perf_counter()
+    at.radio(key="section").set_value(tab).run()
+    first = time.perf_counter() - start
+    first_calls = stand_in.snapshot() - before
+
+    times, calls = [], Counter()
+    for i in range(reruns):
+        before = stand_in.snapshot()
+        start = time.perf_counter()
+        _interaction(at, tab, i)
+        times.append(time.perf_counter() - start)
+        calls += stand_in.snapshot() - before
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "first_render_ms": round(first * 1000, 2),
+        "first_render_calls": dict(first_calls),
+        "rerun": _summary(times) if times else None,
+        "calls_per_rerun": {k: round(v / reruns, 2) for k, v in calls.items()} if reruns else {},
+        "python_mem_retained_kb": round(current / 1024, 1),
+        "python_mem_peak_kb": round(peak / 1024, 1),
+        "exceptions": [e.message for e in at.exception],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reruns", type=int, default=5)
+    parser.add_argument("--tabs", nargs="*", help="substrings of tab labels to run (default: all)")
+    parser.add_argument("--openai-latency", type=float, default=0.2, help="seconds before the first token")
+    parser.add_argument("--token-delay", type=float, default=0.005, help="seconds between streamed tokens")
+    parser.add_argument("--bible-latency", type=float, default=0.15)
+    parser.add_argument("--rss-latency", type=float, default=0.3)
+    parser.add_argument("--items", type=int, default=20, help="items per stand-in feed")
+    parser.add_argument("--timeout", type=float, default=120, help="AppTest timeout per run, seconds")
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    stand_in = StandIn(args.openai_latency, args.token_delay, args.bible_latency, args.rss_latency, args.items)
+    server = serve(Handler, stand_in)
+    base = server.url
+
+    tmp = tempfile.mkdtemp()
+    os.environ.update({
+        "TOKENS_DB": os.path.join(tmp, "tokens.db"),
+        "CACHE_DB": os.path.join(tmp, "cache.db"),
+        "OPENAI_API_KEY": "sk-stand-in",
+        "OPENAI_BASE_URL": f"{base}/v1",
+        "BIBLE_API_URL": f"{base}/bible",
+        "DAILY_FREE_TOKENS": "1000000",
+    })
+    sys.path.insert(0, REPO_DIR)
+    os.chdir(REPO_DIR)
+
+    # Feed URLs are module constants; point them (and the sections' copies)
+    # at the stand-in before app.py first runs.
+    import feeds
+    from sections import devotional, news
+    feeds.NEWS_FEEDS[:] = [f"{base}/rss/{name}" for name in FEEDS]
+    feeds.DEVOTIONAL_FEED = devotional.DEVOTIONAL_FEED = f"{base}/rss/{DEVOTIONAL}"
+    assert news.NEWS_FEEDS is feeds.NEWS_FEEDS
+
+    tabs = [t for t in TABS if not args.tabs or any(s.lower() in t.lower() for s in args.tabs)]
+    results = {}
+    for tab in tabs:
+        print(f"benchmarking {tab}...", file=sys.stderr)
+        results[tab] = bench_tab(tab, stand_in, args.reruns, args.timeout)
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=REPO_DIR).stdout.strip() or None
+    except OSError:
+        commit = None
+    report = {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {k: v for k, v in vars(args).items() if k not in ("output", "tabs")},
+        "tabs": results,
+    }
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Drive openai_scheduler against a local OpenAI stand-in that answers 429.
+
+Runs entirely offline. The stand-in streams chat completions but rejects a
+request with 429 (and a Retry-After) when more than --server-limit streams
+are open, plus a random --rate-429 share of the rest. Simulated users ask
+questions drawn from a small pool, so some overlap and can be coalesced.
+
+Both ways of calling are measured: "direct" (each session calls the client
+itself, using the SDK's own retries) and "scheduled" (everything through one
+OpenAIScheduler).
+
+    python benchmarks/openai_scheduler_load.py --users 20 --questions 5 --server-limit 4
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from openai import OpenAI  # noqa: E402
+
+from chat_stream import stream_chat  # noqa: E402
+from openai_scheduler import OpenAIScheduler, RetryBudget  # noqa: E402
+from stand_in import StandInHandler, serve  # noqa: E402
+
+
+class FakeOpenAI:
+    def __init__(self, limit, rate_429, first_token, token_delay, tokens=40):
+        self.limit = limit
+        self.rate_429 = rate_429
+        self.first_token = first_token
+        self.token_delay = token_delay
+        self.tokens = tokens
+        self.open = 0
+        self.calls = Counter()
+        self.lock = threading.Lock()
+
+
+class Handler(StandInHandler):
+    def do_POST(self):
+        fake = self.server.stand_in
+        self.read_body()
+        with fake.lock:
+            rejected = fake.open >= fake.limit or random.random() < fake.rate_429
+            fake.calls["429" if rejected else "200"] += 1
+            if not rejected:
+                fake.open += 1
+        if rejected:
+            body = json.dumps({"error": {"message": "Rate limit reached", "type": "requests",
+                                         "code": "rate_limit_exceeded"}}).encode()
+            self.send(429, body, headers={"Retry-After": "0.2"})
+            return
+        try:
+            self.start_chunked()
+            time.sleep(fake.first_token)
+            for i in range(fake.tokens):
+                chunk = {"id": "c", "object": "chat.completion.chunk", "created": 0, "model": "m",
+                         "choices": [{"index": 0, "delta": {"content": f"w{i} "}, "finish_reason": None}]}
+                self.send_chunk(f"data: {json.dumps(chunk)}\n\n".encode())
+                time.sleep(fake.token_delay)
+            self.send_chunk(b"data: [DONE]\n\n")
+            self.send_chunk(b"")
+        finally:
+            with fake.lock:
+                fake.open -= 1
+
+
+def run(mode, args, base_url, fake):
+    fake_calls_before = Counter(fake.calls)
+    client = OpenAI(api_key="sk-stand-in", base_url=base_url, max_retries=0 if mode == "scheduled" else 2)
+    scheduler = OpenAIScheduler(max_concurrency=args.concurrency, budget=RetryBudget()) if mode == "scheduled" else None
+    pool = [f"Question {i} about grace" for i in range(args.pool)]
+    latencies, per_user, outcomes = [], defaultdict(list), Counter()
+    lock = threading.Lock()
+
+    def user(u):
+        for _ in range(args.questions):
+            messages = [{"role": "user", "content": random.choice(pool)}]
+            start = time.perf_counter()
+            try:
+                if scheduler:
+                    text = "".join(scheduler.stream_chat(client, messages, user_id=f"user-{u}"))
+                else:
+                    text = "".join(stream_chat(client, messages))
+                outcome = "ok" if text else "empty"
+            except Exception as e:
+                outcome = type(e).__name__
+            elapsed = time.perf_counter() - start
+            with lock:
+                outcomes[outcome] += 1
+                if outcome == "ok":
+                    latencies.append(elapsed)
+                    per_user[u].append(elapsed)
+
+    threads = [threading.Thread(target=user, args=(u,)) for u in range(args.users)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - start
+
+    latencies.sort()
+    user_means = [statistics.mean(v) for v in per_user.values()]
+    result = {
+        "wall_s": round(wall, 2),
+        "outcomes": dict(outcomes),
+        "upstream": dict(Counter(fake.calls) - fake_calls_before),
+        "latency_p50_s": round(latencies[len(latencies) // 2], 3) if latencies else None,
+        "latency_p95_s": round(latencies[int(len(latencies) * 0.95)], 3) if latencies else None,
+        "user_mean_spread_s": round(max(user_means) - min(user_means), 3) if user_means else None,
+    }
+    if scheduler:
+        result["scheduler"] = scheduler.stats()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--questions", type=int, default=5, help="questions per user")
+    parser.add_argument("--pool", type=int, default=30, help="distinct questions users draw from")
+    parser.add_argument("--concurrency", type=int, default=4, help="scheduler concurrency")
+    parser.add_argument("--server-limit", type=int, default=4, help="open streams before the stand-in 429s")
+    parser.add_argument("--rate-429", type=float, default=0.05, help="extra random 429 share")
+    parser.add_argument("--first-token", type=float, default=0.2)
+    parser.add_argument("--token-delay", type=float, default=0.005)
+    parser.add_argument("--modes", nargs="*", default=["direct", "scheduled"])
+    args = parser.parse_args()
+
+    fake = FakeOpenAI(args.server_limit, args.rate_429, args.first_token, args.token_delay)
+    server = serve(Handler, fake)
+    base_url = f"{server.url}/v1"
+
+    report = {mode: run(mode, args, base_url, fake) for mode in args.modes}
+    print(json.dumps(report, indent=2))
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Cost of finding and expanding scripture references in long chat answers.
+
+Runs entirely offline. Synthetic answers of increasing length cite a mix of
+full names, abbreviations and ranges; for each one the suite times the
+regex scan, the batched lookup and the HTML for the message, and compares
+the lookup with fetching once per reference. Chapters come from a
+ChapterCache in a temporary directory whose "API" sleeps --fetch-latency
+seconds, so the first (cold) turn shows what batching saves on the network
+and the warm turns show the steady-state cost per answer.
+
+The "history_page" case loads a page of --page answers the way the chat tab
+does when a session starts or "Show earlier messages" is pressed, comparing
+one lookup per answer with one expand_references() call for the whole page.
+
+    python benchmarks/scripture_refs_bench.py --lengths 2000 8000 32000 --fetch-latency 0.05 --page 20
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chapter_cache import ChapterCache  # noqa: E402
+from scripture_refs import expand_references, find_references, resolve  # noqa: E402
+from transcript import message_html  # noqa: E402
+
+CITATIONS = ["Proverbs 3:5-6", "Prov. 3:5", "John 3:16", "Jn 14:27", "1 Cor 13:4-7", "Romans 8:28",
+             "Ps 23:1", "Psalm 46:10", "Isa 40:31", "Phil 4:6-7", "Matt 11:28", "Heb 11:1",
+             "II Timothy 1:7", "Jas 1:5", "Rev 21:4", "Gen 1:1", "Lam 3:22-23", "1 John 4:8"]
+FILLER = ("God's love meets us in the quiet places, and His promises hold when our "
+          "strength runs thin. Scripture invites us to rest, to trust and to hope. ").split()
+
+
+def make_answer(length, citations_per_kb):
+    words, size = [], 0
+    while size < length:
+        word = random.choice(CITATIONS) if random.random() < citations_per_kb * 6 / 1000 else random.choice(FILLER)
+        words.append(word)
+        size += len(word) + 1
+    return " ".join(words)
+
+
+def fake_fetch(latency, calls):
+    def fetch(book, chapter):
+        calls.append((book, chapter))
+        time.sleep(latency)
+        return {"verses": [{"book_name": book, "chapter": chapter, "verse": v, "text": f"Verse {v} of {book} {chapter}."}
+                           for v in range(1, 41)]}
+    return fetch
+
+
+def bench(length, args):
+    answer = make_answer(length, args.citations_per_kb)
+    result = {"chars": len(answer)}
+    for mode in ("per_reference", "batched"):
+        calls = []
+        cache = ChapterCache(path=os.path.join(tempfile.mkdtemp(), "cache.db"),
+                             fetch=fake_fetch(args.fetch_latency, calls))
+        turns = []
+        for _ in range(args.turns):
+            start = time.perf_counter()
+            references = find_references(answer)
+            scanned = time.perf_counter()
+            if mode == "batched":
+                texts = resolve(references, chapter_cache=cache)
+            else:
+                texts = {}
+                for ref in references:
+                    data = cache.get(ref.book, ref.chapter) or {}
+                    texts[ref.label] = " ".join(v["text"] for v in data.get("verses", [])
+                                                if ref.start <= v["verse"] <= ref.end)
+            resolved = time.perf_counter()
+            message_html("assistant", answer, [(ref.label, texts[ref.label]) for ref in references if ref.label in texts])
+            rendered = time.perf_counter()
+            turns.append((scanned - start, resolved - scanned, rendered - resolved))
+        warm = turns[1:] or turns
+        result[mode] = {
+            "references": len(references),
+            "chapters_fetched": len(calls),
+            "cold_ms": round(sum(turns[0]) * 1000, 2),
+            "warm_scan_ms": round(min(t[0] for t in warm) * 1000, 3),
+            "warm_lookup_ms": round(min(t[1] for t in warm) * 1000, 3),
+            "warm_render_ms": round(min(t[2] for t in warm) * 1000, 3),
+        }
+    return result
+
+
+def bench_page(args):
+    answers = [make_answer(args.page_answer_chars, args.citations_per_kb) for _ in range(args.page)]
+    result = {"answers": len(answers)}
+    for mode in ("per_answer", "batched"):
+        calls = []
+        cache = ChapterCache(path=os.path.join(tempfile.mkdtemp(), "cache.db"),
+                             fetch=fake_fetch(args.fetch_latency, calls))
+        start = time.perf_counter()
+        if mode == "batched":
+            expand_references(answers, chapter_cache=cache)
+        else:
+            for answer in answers:
+                expand_references([answer], chapter_cache=cache)
+        result[mode] = {"chapters_fetched": len(calls), "cold_ms": round((time.perf_counter() - start) * 1000, 2)}
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lengths", type=int, nargs="*", default=[2000, 8000, 32000], help="answer sizes, characters")
+    parser.add_argument("--citations-per-kb", type=float, default=2.0)
+    parser.add_argument("--fetch-latency", type=float, default=0.05, help="seconds per stand-in chapter fetch")
+    parser.add_argument("--turns", type=int, default=5, help="times each answer is processed")
+    parser.add_argument("--page", type=int, default=20, help="answers in a history page (0 to skip)")
+    parser.add_argument("--page-answer-chars", type=int, default=1500)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    report = {length: bench(length, args) for length in args.lengths}
+    if args.page:
+        report["history_page"] = bench_page(args)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
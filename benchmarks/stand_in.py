@@ -0,0 +1,59 @@
+"""Local HTTP stand-ins for the services the benchmarks talk to.
+
+Each benchmark keeps only its per-service responses: it subclasses
+StandInHandler with do_GET/do_POST, reaches its own state through
+self.server.stand_in, and starts the server with serve():
+
+    class Handler(StandInHandler):
+        def do_GET(self):
+            self.send(200, json.dumps(self.server.stand_in.answer()).encode())
+
+    server = serve(Handler, stand_in)
+    requests.get(server.url + "/...")
+
+The server listens on a free localhost port, on a daemon thread, with one
+thread per connection, and stays quiet: no request log, and no tracebacks
+when a client hangs up mid-response.
+"""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def read_body(self):
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def send(self, status, data=b"", content_type="application/json", headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def start_chunked(self, status=200, content_type="text/event-stream"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+    def send_chunk(self, data):
+        """Write one chunk; an empty one ends the response."""
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(handler_class, stand_in):
+    """Serve handler_class on 127.0.0.1; returns the server, with .url and .stand_in."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler_class)
+    server.daemon_threads = True
+    server.handle_error = lambda request, client_address: None  # clients hanging up mid-stream
+    server.stand_in = stand_in
+    server.url = f"http://127.0.0.1:{server.server_port}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,149 @@
+"""Push a local tokens.db to a PostgREST stand-in through supabase_sync.
+
+Runs entirely offline: a small HTTP server mimics Supabase's upsert endpoint
+(POST /rest/v1/<table>?on_conflict=<column>) and fails a share of requests
+with 503 to exercise the retry/backoff path. A temporary tokens.db is filled
+with chat history and balances, synced, changed, and synced again; the stand-in's
+tables are then compared against the local ones.
+
+    python benchmarks/supabase_sync_load.py --messages 20000 --fail-rate 0.2
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+from stand_in import StandInHandler, serve
+
+
+class StandIn:
+    def __init__(self, fail_rate=0.0, latency=0.0):
+        self.fail_rate = fail_rate
+        self.latency = latency
+        self.tables = {}
+        self.requests = 0
+        self.failures = 0
+        self.lock = threading.Lock()
+
+
+
+class Handler(StandInHandler):
+    def do_POST(self):
+        stand_in = self.server.stand_in
+        url = urlparse(self.path)
+        table = url.path.rsplit("/", 1)[-1]
+        conflict = parse_qs(url.query).get("on_conflict", ["id"])[0]
+        rows = json.loads(self.read_body())
+        time.sleep(stand_in.latency)
+        with stand_in.lock:
+            stand_in.requests += 1
+            if random.random() < stand_in.fail_rate:
+                stand_in.failures += 1
+                self.send(503)
+                return
+            target = stand_in.tables.setdefault(table, {})
+            for row in rows:
+                target.setdefault(row[conflict], {}).update(row)
+        self.send(201)
+
+
+class RestClient:
+    """Just enough of the supabase client for SyncWorker: table().upsert().execute()."""
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.session = requests.Session()
+
+    def table(self, name):
+        client = self
+
+        class Upsert:
+            def upsert(self, records, on_conflict):
+                self.records, self.on_conflict = records, on_conflict
+                return self
+
+            def execute(self):
+                response = client.session.post(
+                    f"{client.base_url}/rest/v1/{name}",
+                    params={"on_conflict": self.on_conflict},
+                    json=self.records,
+                    headers={"Prefer": "resolution=merge-duplicates"},
+                    timeout=10,
+                )
+                response.raise_for_status()
+
+        return Upsert()
+
+
+def fill(db_path, messages, users):
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "INSERT INTO chat_history (user_id, role, message) VALUES (?, ?, ?)",
+        [(f"user_{i % users}", "user" if i % 2 == 0 else "assistant", f"message {i}") for i in range(messages)],
+    )
+    conn.executemany(
+        "INSERT OR REPLACE INTO user_tokens (user_id, tokens_left, last_reset) VALUES (?, ?, date('now'))",
+        [(f"user_{i}", random.randint(0, 5000)) for i in range(users)],
+    )
+    conn.commit()
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=10000)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--fail-rate", type=float, default=0.1)
+    parser.add_argument("--latency", type=float, default=0.005, help="seconds per request")
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(), "tokens.db")
+    os.environ["TOKENS_DB"] = db_path
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from chat_history import HistoryStore
+    from supabase_sync import SyncWorker
+
+    stand_in = StandIn(args.fail_rate, args.latency)
+    server = serve(Handler, stand_in)
+    client = RestClient(server.url)
+
+    HistoryStore(db_path)  # creates chat_history
+    worker = SyncWorker(db_path, client_factory=lambda: client, batch_size=args.batch_size,
+                        max_retries=8, base_delay=0.01)
+    fill(db_path, args.messages, args.users)
+
+    start = time.perf_counter()
+    pushed = worker.sync_once()
+    first = time.perf_counter() - start
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE user_tokens SET tokens_left = tokens_left - 1 WHERE rowid % 10 = 0")
+    conn.commit()
+    start = time.perf_counter()
+    changed = worker.sync_once()
+    second = time.perf_counter() - start
+
+    local_history = conn.execute("SELECT COUNT(*) FROM chat_history").fetchone()[0]
+    local_tokens = dict(conn.execute("SELECT user_id, tokens_left FROM user_tokens"))
+    remote_tokens = {k: v["tokens_left"] for k, v in stand_in.tables.get("user_tokens", {}).items()}
+    ok = len(stand_in.tables.get("chat_history", {})) == local_history and remote_tokens == local_tokens
+
+    print(f"initial sync: {pushed} rows in {first:.2f}s ({pushed / first:.0f} rows/s)")
+    print(f"delta sync:   {changed} rows in {second:.2f}s")
+    print(f"requests: {stand_in.requests}, injected failures: {stand_in.failures}")
+    print("remote matches local" if ok else "MISMATCH between remote and local")
+    server.shutdown()
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
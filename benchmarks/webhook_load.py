@@ -0,0 +1,99 @@
+"""Replay a burst of signed Stripe events against webhook.py.
+
+Runs entirely offline: events are signed with a local stand-in secret, posted
+through Flask's test client from several threads, and written to a temporary
+tokens.db. Every event is delivered twice to mimic Stripe retries, and the
+final balances are checked for double credits.
+
+    python benchmarks/webhook_load.py --events 2000 --threads 16
+"""
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+SECRET = "whsec_local_stand_in"
+
+
+def sign(payload, secret=SECRET):
+    timestamp = int(time.time())
+    signature = hmac.new(secret.encode(), f"{timestamp}.{payload}".encode(), hashlib.sha256).hexdigest()
+    return f"t={timestamp},v1={signature}"
+
+
+def make_event(i, users):
+    price_id = random.choice(["supporter", "sustainer", "patron"])
+    return {
+        "id": f"evt_load_{i}",
+        "object": "event",
+        "type": "checkout.session.completed",
+        "data": {"object": {
+            "object": "checkout.session",
+            "client_reference_id": random.choice(users),
+            "metadata": {"price_id": price_id},
+        }},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=1000)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--threads", type=int, default=16)
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(), "tokens.db")
+    os.environ["TOKENS_DB"] = db_path
+    os.environ["STRIPE_WEBHOOK_SECRET"] = SECRET
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import webhook
+
+    users = [f"user_{i}" for i in range(args.users)]
+    events = [make_event(i, users) for i in range(args.events)]
+    deliveries = events + events  # every event is retried once
+    random.shuffle(deliveries)
+
+    def deliver(event):
+        payload = json.dumps(event)
+        client = webhook.app.test_client()
+        start = time.perf_counter()
+        response = client.post("/webhook", data=payload, headers={"Stripe-Signature": sign(payload)})
+        return response.status_code, time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        results = list(pool.map(deliver, deliveries))
+    acked = time.perf_counter() - start
+    webhook.credit_worker.flush()
+    applied = time.perf_counter() - start
+
+    expected = {}
+    for event in events:
+        session = event["data"]["object"]
+        user = session["client_reference_id"]
+        expected[user] = expected.get(user, 0) + webhook.TOKEN_MAP[session["metadata"]["price_id"]]
+    conn = webhook.db.connect(db_path)
+    actual = dict(conn.execute("SELECT user_id, tokens_left FROM user_tokens"))
+    processed = conn.execute("SELECT COUNT(*) FROM processed_events").fetchone()[0]
+
+    latencies = sorted(latency * 1000 for _, latency in results)
+    print(f"deliveries:     {len(deliveries)} ({args.events} events, each sent twice)")
+    print(f"non-200:        {sum(status != 200 for status, _ in results)}")
+    print(f"ack throughput: {len(deliveries) / acked:.0f} req/s")
+    print(f"ack latency:    p50 {statistics.median(latencies):.2f} ms, "
+          f"p95 {latencies[int(len(latencies) * 0.95)]:.2f} ms")
+    print(f"all applied in: {applied:.2f} s")
+    print(f"processed:      {processed} events")
+    print(f"balances:       {'OK' if actual == expected else 'MISMATCH'}")
+    return 0 if actual == expected and processed == args.events else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,43 @@
+# --- Canonical 66-book / 1,189-chapter structure (Protestant canon order) ---
+BOOK_CHAPTERS = {
+    "Genesis": 50, "Exodus": 40, "Leviticus": 27, "Numbers": 36, "Deuteronomy": 34,
+    "Joshua": 24, "Judges": 21, "Ruth": 4, "1 Samuel": 31, "2 Samuel": 24,
+    "1 Kings": 22, "2 Kings": 25, "1 Chronicles": 29, "2 Chronicles": 36,
+    "Ezra": 10, "Nehemiah": 13, "Esther": 10, "Job": 42, "Psalms": 150,
+    "Proverbs": 31, "Ecclesiastes": 12, "Song of Solomon": 8, "Isaiah": 66,
+    "Jeremiah": 52, "Lamentations": 5, "Ezekiel": 48, "Daniel": 12,
+    "Hosea": 14, "Joel": 3, "Amos": 9, "Obadiah": 1, "Jonah": 4, "Micah": 7,
+    "Nahum": 3, "Habakkuk": 3, "Zephaniah": 3, "Haggai": 2, "Zechariah": 14,
+    "Malachi": 4, "Matthew": 28, "Mark": 16, "Luke": 24, "John": 21,
+    "Acts": 28, "Romans": 16, "1 Corinthians": 16, "2 Corinthians": 13,
+    "Galatians": 6, "Ephesians": 6, "Philippians": 4, "Colossians": 4,
+    "1 Thessalonians": 5, "2 Thessalonians": 3, "1 Timothy": 6, "2 Timothy": 4,
+    "Titus": 3, "Philemon": 1, "Hebrews": 13, "James": 5, "1 Peter": 5,
+    "2 Peter": 3, "1 John": 5, "2 John": 1, "3 John": 1, "Jude": 1, "Revelation": 22
+}
+BOOKS = list(BOOK_CHAPTERS)
+OLD_TESTAMENT = BOOKS[:39]
+NEW_TESTAMENT = BOOKS[39:]
+
+# Alternate names used by common translation files.
+BOOK_ALIASES = {
+    "Psalm": "Psalms",
+    "Song of Songs": "Song of Solomon",
+    "Canticles": "Song of Solomon",
+    "Revelations": "Revelation",
+    "Revelation of John": "Revelation",
+}
+
+_ROMAN_PREFIXES = {"I ": "1 ", "II ": "2 ", "III ": "3 "}
+_BOOKS_BY_KEY = {name.lower().replace(" ", ""): name for name in BOOKS}
+_BOOKS_BY_KEY.update({alias.lower().replace(" ", ""): name for alias, name in BOOK_ALIASES.items()})
+
+
+def canonical_book(name):
+    """Map a book name such as 'I Samuel' or 'Psalm' to its BOOK_CHAPTERS key."""
+    name = " ".join(name.split())
+    for roman, digit in _ROMAN_PREFIXES.items():
+        if name.startswith(roman):
+            name = digit + name[len(roman):]
+            break
+    return _BOOKS_BY_KEY.get(name.lower().replace(" ", ""))
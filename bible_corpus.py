@@ -0,0 +1,162 @@
+"""Offline Bible text store.
+
+A translation is imported once into a single compact file:
+
+    magic | header | chapter index | verse offsets | UTF-8 text
+
+Opening the file only mmaps it; the two index arrays are zero-copy views, so
+looking up any verse is two array reads and a slice of the text blob.
+
+Import a public-domain translation with:
+
+    python bible_corpus.py kjv.tsv --translation KJV
+
+The source may be tab-separated (Book, Chapter, Verse, Text) or a JSON list of
+verse objects with book/book_name, chapter, verse and text keys.
+"""
+import argparse
+import csv
+import json
+import mmap
+import os
+import struct
+from array import array
+
+from bible_books import BOOK_CHAPTERS, canonical_book
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bible_corpus.bin")
+
+MAGIC = b"NM2BIBL1"
+HEADER = struct.Struct("<8sIII")  # magic, metadata length, chapters, verses
+
+
+def _chapter_ordinals(books):
+    ordinals, total = {}, 0
+    for name, chapters in books:
+        ordinals[name] = total
+        total += chapters
+    return ordinals, total
+
+
+class BibleCorpus:
+    def __init__(self, path=CORPUS_PATH):
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, meta_len, chapter_count, verse_count = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a Bible corpus file")
+        pos = HEADER.size
+        meta = json.loads(bytes(self._mm[pos:pos + meta_len]))
+        pos += meta_len + (-meta_len % 4)
+        self._view = view = memoryview(self._mm)
+        self._chapter_start = view[pos:pos + 4 * (chapter_count + 1)].cast("I")
+        pos += 4 * (chapter_count + 1)
+        self._verse_offsets = view[pos:pos + 4 * (verse_count + 1)].cast("I")
+        self._text_start = pos + 4 * (verse_count + 1)
+        self.translation = meta["translation"]
+        self.book_chapters = dict(meta["books"])
+        self._ordinals, _ = _chapter_ordinals(meta["books"])
+
+    def _chapter_range(self, book, chapter):
+        if not 1 <= chapter <= self.book_chapters.get(book, 0):
+            return None
+        ordinal = self._ordinals[book] + chapter - 1
+        return self._chapter_start[ordinal], self._chapter_start[ordinal + 1]
+
+    def _text(self, index):
+        start = self._text_start + self._verse_offsets[index]
+        end = self._text_start + self._verse_offsets[index + 1]
+        return self._mm[start:end].decode("utf-8")
+
+    def get_verse(self, book, chapter, verse):
+        bounds = self._chapter_range(book, chapter)
+        if not bounds or not 1 <= verse <= bounds[1] - bounds[0]:
+            return None
+        return self._text(bounds[0] + verse - 1) or None
+
+    def get_verses(self, book, chapter, start=1, end=None):
+        """Return verses start..end (inclusive) in bible-api.com's verse format."""
+        bounds = self._chapter_range(book, chapter)
+        if not bounds:
+            return []
+        count = bounds[1] - bounds[0]
+        end = count if end is None else min(end, count)
+        verses = []
+        for number in range(max(start, 1), end + 1):
+            text = self._text(bounds[0] + number - 1)
+            if text:
+                verses.append({"book_name": book, "chapter": chapter, "verse": number, "text": text})
+        return verses
+
+    def get_chapter(self, book, chapter):
+        return self.get_verses(book, chapter)
+
+    def close(self):
+        self._chapter_start.release()
+        self._verse_offsets.release()
+        self._view.release()
+        self._mm.close()
+        self._file.close()
+
+
+def load_corpus(path=CORPUS_PATH):
+    """Open the local corpus, or return None if it hasn't been imported."""
+    if not os.path.exists(path):
+        return None
+    return BibleCorpus(path)
+
+
+# --- Importer ---
+def _read_source(src):
+    if src.endswith(".json"):
+        with open(src, encoding="utf-8") as f:
+            for row in json.load(f):
+                yield row.get("book_name") or row["book"], row["chapter"], row["verse"], row["text"]
+        return
+    with open(src, encoding="utf-8", newline="") as f:
+        for row in csv.reader(f, delimiter="," if src.endswith(".csv") else "\t"):
+            if len(row) >= 4 and row[1].strip().isdigit():
+                yield row[0], row[1], row[2], row[3]
+
+
+def import_corpus(src, dest=CORPUS_PATH, translation="KJV"):
+    """Build a corpus file from a verse-per-row source file. Returns the verse count."""
+    books = list(BOOK_CHAPTERS.items())
+    ordinals, chapter_count = _chapter_ordinals(books)
+    chapters = [dict() for _ in range(chapter_count)]
+    for book, chapter, verse, text in _read_source(src):
+        name = canonical_book(str(book))
+        chapter, verse = int(chapter), int(verse)
+        if name is None or not 1 <= chapter <= BOOK_CHAPTERS[name]:
+            raise ValueError(f"Unknown reference in {src}: {book} {chapter}:{verse}")
+        chapters[ordinals[name] + chapter - 1][verse] = " ".join(str(text).split())
+
+    # Verses are stored densely from 1 to the highest number in each chapter;
+    # gaps (verses a translation omits) become empty strings.
+    chapter_start, verse_offsets, blob = array("I", [0]), array("I", [0]), bytearray()
+    for verses in chapters:
+        for number in range(1, max(verses, default=0) + 1):
+            blob += verses.get(number, "").encode("utf-8")
+            verse_offsets.append(len(blob))
+        chapter_start.append(len(verse_offsets) - 1)
+
+    meta = json.dumps({"translation": translation, "books": books}).encode("utf-8")
+    tmp = dest + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(meta), chapter_count, len(verse_offsets) - 1))
+        f.write(meta + b"\0" * (-len(meta) % 4))
+        f.write(chapter_start.tobytes())
+        f.write(verse_offsets.tobytes())
+        f.write(blob)
+    os.replace(tmp, dest)
+    return len(verse_offsets) - 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import a Bible translation for offline reading.")
+    parser.add_argument("source", help="TSV/CSV (Book, Chapter, Verse, Text) or JSON verse list")
+    parser.add_argument("--translation", default="KJV")
+    parser.add_argument("--output", default=CORPUS_PATH)
+    args = parser.parse_args()
+    count = import_corpus(args.source, args.output, args.translation)
+    print(f"✅ Imported {count} verses into {args.output}")
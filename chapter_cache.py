@@ -0,0 +1,264 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from urllib.parse import quote
+
+import requests
+
+import db
+from metrics import set_gauge, span
+
+BIBLE_API_URL = os.getenv("BIBLE_API_URL", "https://bible-api.com")
+
+
+@span("bible_api.fetch")
+def fetch_chapter(book, chapter):
+    """Fetch a chapter from bible-api.com and return the decoded JSON."""
+    response = requests.get(f"{BIBLE_API_URL}/{quote(book)}%20{int(chapter)}", timeout=10)
+    response.raise_for_status()
+    return response.json()
+
+
+class ChapterCache:
+    """Two-level (memory LRU + SQLite) cache in front of the Bible API.
+
+    Expired chapters are refetched, but if the API is down the stale copy is
+    served instead of an error.
+
+    prefetch() warms the chapters either side of the one being read on a
+    small background pool, paced to `prefetch_bandwidth` bytes per second.
+    A chapter is only ever fetched once at a time: a reader who turns the
+    page while it is still being prefetched waits for that fetch.
+
+    Counters and hit rates are published as chapter_cache.* gauges (on
+    /metrics) as they change; stats() also reports the table sizes.
+    """
+
+    def __init__(self, path=db.CACHE_DB_PATH, max_memory=128, max_disk=5000,
+                 ttl=30 * 24 * 3600, fetch=fetch_chapter, prefetch_workers=2,
+                 prefetch_bandwidth=256 * 1024, max_pending_prefetches=8):
+        self.max_memory = max_memory
+        self.max_disk = max_disk
+        self.ttl = ttl
+        self.prefetch_bandwidth = prefetch_bandwidth
+        self.max_pending_prefetches = max_pending_prefetches
+        self._fetch = fetch
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()
+        self._inflight = {}  # key -> Future of the one fetch running for it
+        self._prefetching = set()  # being fetched by prefetch right now
+        self._prefetched = set()  # warmed by prefetch, not read yet
+        self._pending_prefetches = 0
+        self._next_prefetch_at = 0.0  # monotonic time the next prefetch may start
+        self._last_prefetch_size = 32 * 1024  # bytes; estimates the next fetch's share of the cap
+        self._prefetcher = ThreadPoolExecutor(max_workers=prefetch_workers, thread_name_prefix="chapter-prefetch")
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0,
+                          "stale_hits": 0, "errors": 0, "evictions": 0,
+                          "prefetches": 0, "prefetch_hits": 0, "prefetch_joins": 0,
+                          "prefetch_skipped": 0}
+        self._conn = db.connect(path)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS chapter_cache (
+                book TEXT NOT NULL,
+                chapter INTEGER NOT NULL,
+                data TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (book, chapter)
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_chapter_cache_access ON chapter_cache(last_access)"
+        )
+        self._conn.commit()
+
+    def get(self, book, chapter):
+        """Return the chapter JSON, or None if it can't be fetched or found."""
+        try:
+            return self._get((book, int(chapter)))
+        finally:
+            with self._lock:
+                self._publish()
+
+    def _get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and now - entry[1] < self.ttl:
+                self._memory.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                self._count_prefetch_hit(key)
+                return entry[0]
+            if not entry:
+                entry = self._load(key, now)
+                if entry and now - entry[1] < self.ttl:
+                    self._remember(key, entry)
+                    self._counters["disk_hits"] += 1
+                    self._count_prefetch_hit(key)
+                    return entry[0]
+            if key in self._prefetching and key in self._inflight:
+                self._counters["prefetch_joins"] += 1
+                self._prefetching.discard(key)  # counted; don't count it as a hit too
+
+        # Missing or expired: go to the network outside the lock.
+        try:
+            data = self._fetch_once(key)
+        except Exception:
+            with self._lock:
+                self._counters["errors"] += 1
+                if entry:
+                    self._counters["stale_hits"] += 1
+                    return entry[0]
+            return None
+
+        with self._lock:
+            self._counters["misses"] += 1
+        return data
+
+    def prefetch(self, book, chapter, last_chapter):
+        """Warm the chapters before and after `chapter` (1..last_chapter) in the background."""
+        for neighbour in (int(chapter) + 1, int(chapter) - 1):
+            if not 1 <= neighbour <= last_chapter:
+                continue
+            key = (book, neighbour)
+            with self._lock:
+                if key in self._memory or key in self._inflight:
+                    continue
+                if self._pending_prefetches >= self.max_pending_prefetches:
+                    self._counters["prefetch_skipped"] += 1
+                    continue
+                self._pending_prefetches += 1
+            self._prefetcher.submit(self._prefetch_one, key)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats["memory_size"] = len(self._memory)
+            stats["disk_size"] = self._conn.execute("SELECT COUNT(*) FROM chapter_cache").fetchone()[0]
+        stats.update(self._rates(stats))
+        return stats
+
+    @staticmethod
+    def _rates(counters):
+        lookups = counters["memory_hits"] + counters["disk_hits"] + counters["misses"]
+        used = counters["prefetch_hits"] + counters["prefetch_joins"]
+        return {
+            "hit_rate": (counters["memory_hits"] + counters["disk_hits"]) / lookups if lookups else 0.0,
+            "prefetch_hit_rate": used / counters["prefetches"] if counters["prefetches"] else 0.0,
+        }
+
+    # --- Fetching ---
+    def _fetch_once(self, key):
+        """Fetch and store a chapter, sharing the result with concurrent callers."""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is None:
+                future = self._inflight[key] = Future()
+                owner = True
+            else:
+                owner = False
+        if not owner:
+            return future.result()
+        try:
+            data = self._fetch(*key)
+            now = time.time()
+            with self._lock:
+                self._remember(key, (data, now))
+                self._store(key, data, now)
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(data)
+            return data
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+    def _prefetch_one(self, key):
+        try:
+            with self._lock:
+                entry = self._memory.get(key) or self._load(key, time.time())
+                if entry and time.time() - entry[1] < self.ttl:
+                    self._remember(key, entry)
+                    return  # already on disk; now in memory too
+                self._prefetching.add(key)
+                # Pace prefetch traffic: book this fetch's slot before starting it,
+                # sized like the last one, so parallel workers share the cap.
+                start = max(self._next_prefetch_at, time.monotonic())
+                estimate = self._last_prefetch_size
+                booked = self._next_prefetch_at = start + estimate / self.prefetch_bandwidth
+            wait = start - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            with self._lock:
+                if key in self._memory or key in self._inflight:
+                    # A reader fetched it while we waited; give the slot back if we can.
+                    if self._next_prefetch_at == booked:
+                        self._next_prefetch_at = start
+                    return
+            data = self._fetch_once(key)
+            size = len(json.dumps(data))
+            with self._lock:
+                self._counters["prefetches"] += 1
+                if key in self._prefetching:
+                    self._prefetched.add(key)
+                self._next_prefetch_at += (size - estimate) / self.prefetch_bandwidth
+                self._last_prefetch_size = size
+        except Exception:
+            pass  # a failed prefetch just means the reader fetches it later
+        finally:
+            with self._lock:
+                self._prefetching.discard(key)
+                self._pending_prefetches -= 1
+                self._publish()
+
+    # --- Internals (caller holds self._lock) ---
+    def _publish(self):
+        for name, value in self._counters.items():
+            set_gauge(f"chapter_cache.{name}", value)
+        for name, value in self._rates(self._counters).items():
+            set_gauge(f"chapter_cache.{name}", round(value, 4))
+
+    def _count_prefetch_hit(self, key):
+        if key in self._prefetched:
+            self._prefetched.discard(key)
+            self._counters["prefetch_hits"] += 1
+
+    def _remember(self, key, entry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory:
+            self._memory.popitem(last=False)
+
+    def _load(self, key, now):
+        row = self._conn.execute(
+            "SELECT data, fetched_at FROM chapter_cache WHERE book = ? AND chapter = ?", key
+        ).fetchone()
+        if not row:
+            return None
+        self._conn.execute(
+            "UPDATE chapter_cache SET last_access = ? WHERE book = ? AND chapter = ?", (now, *key)
+        )
+        self._conn.commit()
+        return json.loads(row[0]), row[1]
+
+    def _store(self, key, data, now):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO chapter_cache (book, chapter, data, fetched_at, last_access) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (*key, json.dumps(data), now, now),
+        )
+        count = self._conn.execute("SELECT COUNT(*) FROM chapter_cache").fetchone()[0]
+        if count > self.max_disk:
+            excess = count - self.max_disk
+            self._conn.execute(
+                "DELETE FROM chapter_cache WHERE rowid IN "
+                "(SELECT rowid FROM chapter_cache ORDER BY last_access LIMIT ?)",
+                (excess,),
+            )
+            self._counters["evictions"] += excess
+        self._conn.commit()
@@ -0,0 +1,144 @@
+import threading
+
+from metrics import span
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:  # tiktoken is optional; fall back to a character heuristic
+    _encoding = None
+
+MESSAGE_OVERHEAD = 4  # role/separator tokens the API adds per message
+
+SUMMARY_PROMPT = (
+    "Summarize this conversation between a seeker and a Bible assistant in under "
+    "120 words. Keep names, scripture references, questions still open and anything "
+    "the seeker shared about themselves."
+)
+
+
+def estimate_tokens(text):
+    if _encoding:
+        return len(_encoding.encode(text))
+    return len(text) // 4 + 1
+
+
+def message_tokens(message):
+    return estimate_tokens(message["content"]) + MESSAGE_OVERHEAD
+
+
+def truncate_tokens(text, limit):
+    """The start of `text`, cut to at most `limit` tokens."""
+    if limit <= 0:
+        return ""
+    if _encoding:
+        tokens = _encoding.encode(text)
+        return text if len(tokens) <= limit else _encoding.decode(tokens[:limit])
+    return text[:max(limit - 1, 0) * 4]
+
+
+def openai_summarizer(client, model="gpt-3.5-turbo", call=None):
+    """Return a summarize(previous_summary, messages) function backed by OpenAI.
+
+    `call(fn)`, when given, runs the request (e.g. through the scheduler).
+    """
+    def summarize(previous_summary, messages):
+        transcript = "\n".join(f"{m['role']}: {m['content']}" for m in messages)
+        if previous_summary:
+            transcript = f"Earlier summary: {previous_summary}\n\n{transcript}"
+        def request():
+            with span("openai.summarize", model=model):
+                return client.chat.completions.create(
+                    model=model,
+                    messages=[
+                        {"role": "system", "content": SUMMARY_PROMPT},
+                        {"role": "user", "content": transcript},
+                    ],
+                    temperature=0.2,
+                )
+        completion = call(request) if call else request()
+        return completion.choices[0].message.content.strip()
+    return summarize
+
+
+class ConversationContext:
+    """Builds a bounded prompt from an ever-growing chat history.
+
+    The system prompt and the last `keep_turns` exchanges are sent verbatim.
+    Older messages are folded into a rolling summary, `fold_every` turns at a
+    time so the summarizer runs only occasionally, and the summary is cached
+    until the window moves again. Folding runs on a background thread (unless
+    `background=False`): a turn never waits for the summarizer, it sends the
+    messages not yet folded verbatim instead. The result fits in `budget`
+    tokens, unless the system prompt alone is larger: the oldest verbatim
+    messages go first, then the summary, then the end of the latest message.
+    """
+
+    def __init__(self, summarize, system_prompt=None, keep_turns=4, fold_every=2, budget=2500,
+                 background=True):
+        self.summarize = summarize
+        self.system_prompt = system_prompt
+        self.keep_turns = keep_turns
+        self.fold_every = fold_every
+        self.budget = budget
+        self.background = background
+        self.summary = ""
+        self.covered = 0  # number of leading messages folded into the summary
+        self._lock = threading.Lock()
+        self._folding = None  # the background fold thread, while one runs
+
+    def build(self, messages):
+        messages = [{"role": m["role"], "content": m["content"]} for m in messages]
+        self._fold(messages)
+        with self._lock:
+            summary, covered = self.summary, self.covered
+
+        head = []
+        if self.system_prompt:
+            head.append({"role": "system", "content": self.system_prompt})
+        if summary:
+            head.append({"role": "system", "content": "Summary of the earlier conversation: " + summary})
+        recent = messages[covered:]
+
+        # Drop the oldest verbatim messages until we fit, but always keep the
+        # latest message; then drop the summary, then cut the latest message.
+        used = sum(message_tokens(m) for m in head + recent)
+        while used > self.budget and len(recent) > 1:
+            used -= message_tokens(recent.pop(0))
+        if used > self.budget and summary:
+            used -= message_tokens(head.pop())
+        if used > self.budget and recent:
+            last = recent[-1]
+            limit = message_tokens(last) - (used - self.budget) - MESSAGE_OVERHEAD
+            recent[-1] = {"role": last["role"], "content": truncate_tokens(last["content"], limit)}
+        return head + recent
+
+    def _fold(self, messages):
+        with self._lock:
+            if self.covered > len(messages):  # history was cleared
+                self.summary, self.covered = "", 0
+            if self._folding:
+                return  # the running fold will catch up; the next turn checks again
+            keep = self.keep_turns * 2
+            foldable = len(messages) - keep - self.covered
+            if foldable < self.fold_every * 2:
+                return
+            fold_to = len(messages) - keep
+            args = (self.summary, self.covered, messages[self.covered:fold_to], fold_to)
+            if self.background:
+                self._folding = threading.Thread(target=self._run_fold, args=args, name="chat-fold", daemon=True)
+                self._folding.start()
+                return
+        self._run_fold(*args)
+
+    def _run_fold(self, previous, covered, messages, fold_to):
+        try:
+            summary = self.summarize(previous, messages)
+        except Exception:
+            # Keep the old summary; these messages stay verbatim until the
+            # next successful fold (the budget check still bounds the prompt).
+            summary = None
+        with self._lock:
+            if summary is not None and self.covered == covered:  # not cleared meanwhile
+                self.summary, self.covered = summary, fold_to
+            self._folding = None
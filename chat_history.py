@@ -0,0 +1,111 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+
+import db
+
+logger = logging.getLogger(__name__)
+
+
+class HistoryStore:
+    """Chat history in tokens.db with write-behind batching and keyset paging.
+
+    append() only enqueues; a writer thread inserts queued messages in batches,
+    so a chat turn never waits on a commit. Reads use their own connection,
+    which WAL lets run alongside the writer.
+
+    A batch that fails to insert is retried up to `max_retries` times with
+    exponential backoff (messages appended meanwhile wait in the queue). If it
+    still fails it is dropped and logged: history is best-effort, and those
+    messages are lost from tokens.db (the session that sent them keeps them).
+    """
+
+    def __init__(self, path=db.DB_PATH, batch_size=200, flush_interval=0.5, max_retries=5, base_delay=0.5):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self._queue = queue.Queue()
+        self._read_lock = threading.Lock()
+        self._writer = db.connect(path)
+        self._writer.execute("""
+            CREATE TABLE IF NOT EXISTS chat_history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id TEXT,
+                role TEXT,
+                message TEXT,
+                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        self._writer.execute(
+            "CREATE INDEX IF NOT EXISTS idx_chat_history_user_time ON chat_history(user_id, timestamp, id)"
+        )
+        self._writer.commit()
+        self._reader = db.connect(path)
+        self._thread = threading.Thread(target=self._run, name="chat-history-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def append(self, user_id, role, message):
+        timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S.%f")
+        self._queue.put((user_id, role, message, timestamp))
+
+    def flush(self):
+        """Block until everything appended so far is committed."""
+        self._queue.join()
+
+    def load_page(self, user_id, before=None, limit=20):
+        """Return (messages, cursor) for the `limit` messages preceding `before`.
+
+        Messages are oldest-first; pass the returned cursor back as `before`
+        to load the next older page. The cursor is None when nothing is left.
+        """
+        query = "SELECT id, role, message, timestamp FROM chat_history WHERE user_id = ?"
+        params = [user_id]
+        if before:
+            query += " AND (timestamp, id) < (?, ?)"
+            params += list(before)
+        query += " ORDER BY timestamp DESC, id DESC LIMIT ?"
+        params.append(limit + 1)
+        with self._read_lock:
+            rows = self._reader.execute(query, params).fetchall()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        cursor = (rows[-1][3], rows[-1][0]) if has_more else None
+        messages = [{"role": role, "content": message} for _, role, message, _ in reversed(rows)]
+        return messages, cursor
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            try:
+                while len(batch) < self.batch_size:
+                    batch.append(self._queue.get(timeout=max(deadline - time.monotonic(), 0)))
+            except queue.Empty:
+                pass
+            try:
+                self._write(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write(self, batch):
+        for attempt in range(self.max_retries + 1):
+            try:
+                self._writer.executemany(
+                    "INSERT INTO chat_history (user_id, role, message, timestamp) VALUES (?, ?, ?, ?)", batch
+                )
+                self._writer.commit()
+                return
+            except Exception:
+                self._writer.rollback()
+                if attempt == self.max_retries:
+                    logger.exception("Dropping %d chat messages after %d attempts", len(batch), attempt + 1)
+                    return
+                logger.warning("Could not save %d chat messages (attempt %d), retrying",
+                               len(batch), attempt + 1, exc_info=True)
+                time.sleep(self.base_delay * 2 ** attempt)
@@ -0,0 +1,59 @@
+import itertools
+import time
+
+from metrics import span
+
+MODEL = "gpt-3.5-turbo"
+TEMPERATURE = 0.7
+
+
+def stream_chat(client, messages, model=MODEL, temperature=TEMPERATURE):
+    """Yield text deltas from a streamed chat completion as they arrive."""
+    with span("openai.chat", model=model):
+        stream = None
+        try:
+            with span("openai.first_token", model=model):
+                stream = client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=temperature,
+                    stream=True,
+                )
+                chunks = iter(stream)
+                first = next(chunks, None)
+            if first is not None:
+                for chunk in itertools.chain([first], chunks):
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+        finally:
+            # Runs on completion, error, or when the consumer stops early, so the
+            # HTTP stream is never left open.
+            close = getattr(stream, "close", None)
+            if close:
+                close()
+
+
+def render_stream(deltas, placeholder, refresh_interval=0.05, cursor=" ▌"):
+    """Render text deltas into a Streamlit placeholder as they arrive.
+
+    Returns (text, error): error is the exception that cut the stream short,
+    or None. Streamlit's rerun/stop signals are BaseExceptions and propagate
+    untouched, closing the upstream stream on the way out.
+    """
+    parts, error, last_paint = [], None, 0.0
+    try:
+        for delta in deltas:
+            parts.append(delta)
+            now = time.monotonic()
+            if now - last_paint >= refresh_interval:
+                placeholder.markdown("".join(parts) + cursor)
+                last_paint = now
+    except Exception as e:
+        error = e
+    finally:
+        close = getattr(deltas, "close", None)
+        if close:
+            close()
+    text = "".join(parts)
+    placeholder.markdown(text)
+    return text, error
@@ -0,0 +1,154 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import db
+
+logger = logging.getLogger(__name__)
+
+
+def _now():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+# --- Backends ---
+# Both return comments as {"id", "name", "text", "created_at"} dicts, newest
+# first, and page with an id cursor: page(before=id) returns comments older
+# than that id.
+class SQLiteCommentsBackend:
+    def __init__(self, path=db.DB_PATH):
+        self._lock = threading.Lock()
+        self._conn = db.connect(path)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS comments (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                text TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                updated_at TEXT
+            )
+        """)
+        self._conn.commit()
+
+    def page(self, before=None, limit=10):
+        query = "SELECT id, name, text, created_at FROM comments"
+        params = []
+        if before is not None:
+            query += " WHERE id < ?"
+            params.append(before)
+        query += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [dict(zip(("id", "name", "text", "created_at"), row)) for row in rows]
+
+    def insert(self, name, text):
+        created_at = _now()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO comments (name, text, created_at) VALUES (?, ?, ?)", (name, text, created_at)
+            )
+            self._conn.commit()
+        return {"id": cursor.lastrowid, "name": name, "text": text, "created_at": created_at}
+
+    def update(self, comment_id, name, text):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE comments SET name = ?, text = ?, updated_at = ? WHERE id = ?",
+                (name, text, _now(), comment_id),
+            )
+            self._conn.commit()
+
+
+class SupabaseCommentsBackend:
+    """Same interface over a Supabase `comments` table (id, name, text, created_at)."""
+
+    def __init__(self, client, table="comments"):
+        self._client = client
+        self._table = table
+
+    def page(self, before=None, limit=10):
+        query = self._client.table(self._table).select("id, name, text, created_at")
+        if before is not None:
+            query = query.lt("id", before)
+        return query.order("id", desc=True).limit(limit).execute().data
+
+    def insert(self, name, text):
+        row = {"name": name, "text": text, "created_at": _now()}
+        return self._client.table(self._table).insert(row).execute().data[0]
+
+    def update(self, comment_id, name, text):
+        self._client.table(self._table).update({"name": name, "text": text}).eq("id", comment_id).execute()
+
+
+# --- Store ---
+class CommentsStore:
+    """Process-wide comments cache in front of a backend.
+
+    Pages are cached until a post or edit invalidates them (or `cache_ttl`
+    passes, to pick up other processes' writes). Posts are optimistic: the
+    comment shows at the top of the first page immediately while the insert
+    runs in the background.
+    """
+
+    def __init__(self, backend, cache_ttl=30):
+        self.backend = backend
+        self.cache_ttl = cache_ttl
+        self._lock = threading.Lock()
+        self._cache = {}
+        self._generation = 0  # bumped by every invalidation
+        self._pending = []
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="comments")
+
+    def page(self, before=None, limit=10):
+        """Return (comments, cursor); pass cursor as `before` for the next page."""
+        key = (before, limit)
+        with self._lock:
+            hit = self._cache.get(key)
+            pending = list(self._pending) if before is None else []
+            generation = self._generation
+        if hit and time.monotonic() - hit[0] < self.cache_ttl:
+            comments = hit[1]
+        else:
+            comments = self.backend.page(before, limit)
+            with self._lock:
+                # A write invalidated the cache while we fetched: this page may
+                # predate it, so serve it once but don't cache it.
+                if generation == self._generation:
+                    self._cache[key] = (time.monotonic(), comments)
+        cursor = comments[-1]["id"] if len(comments) == limit else None
+        return pending + comments, cursor
+
+    def post(self, name, text):
+        """Show the comment right away and insert it in the background.
+
+        Returns a Future resolving to the saved comment (with its id).
+        """
+        comment = {"id": None, "name": name, "text": text, "created_at": _now(), "pending": True}
+        with self._lock:
+            self._pending.insert(0, comment)
+
+        def insert():
+            try:
+                return self.backend.insert(name, text)
+            except Exception:
+                logger.exception("Could not save comment")
+                raise
+            finally:
+                with self._lock:
+                    self._pending.remove(comment)
+                    self._invalidate()
+
+        return self._executor.submit(insert)
+
+    def edit(self, comment_id, name, text):
+        self.backend.update(comment_id, name, text)
+        with self._lock:
+            self._invalidate()
+
+    def _invalidate(self):
+        # Called with the lock held.
+        self._cache.clear()
+        self._generation += 1
@@ -0,0 +1,51 @@
+import os
+import sqlite3
+
+# --- Database locations ---
+# tokens.db holds user data (tokens, chat history); cache.db holds
+# disposable caches that can be deleted at any time.
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_PATH = os.getenv("TOKENS_DB", os.path.join(BASE_DIR, "tokens.db"))
+CACHE_DB_PATH = os.getenv("CACHE_DB", os.path.join(BASE_DIR, "cache.db"))
+
+
+def connect(path=DB_PATH):
+    """Open a connection that can be shared across threads (callers lock)."""
+    conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def migrate(conn):
+    """Bring tokens.db up to the current schema. Safe to run on every start."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS user_tokens (
+            user_id TEXT PRIMARY KEY,
+            tokens_left INTEGER,
+            last_reset TEXT
+        )
+    """)
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(user_tokens)")}
+    if "is_paid" not in columns:
+        conn.execute("ALTER TABLE user_tokens ADD COLUMN is_paid INTEGER NOT NULL DEFAULT 0")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS processed_events (
+            event_id TEXT PRIMARY KEY,
+            type TEXT,
+            processed_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    # Paid events waiting to be credited; written before Stripe gets its 200.
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS pending_credits (
+            event_id TEXT PRIMARY KEY,
+            user_id TEXT NOT NULL,
+            tokens INTEGER NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt REAL NOT NULL DEFAULT 0,
+            last_error TEXT,
+            received_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.commit()
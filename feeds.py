@@ -0,0 +1,101 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import feedparser
+import requests
+
+from feed_processing import EntryProcessor
+from metrics import span
+
+# --- Feed URLs ---
+NEWS_FEEDS = [
+    "https://harbingersdaily.com/feed/",
+    "https://livinghisword.org/feed/",
+    "https://www.crosswalk.com/rss/feeds/headlines.xml",
+]
+DEVOTIONAL_FEED = "https://odb.org/feed/"
+
+
+class FeedCache:
+    """Keeps parsed feed entries in memory and refreshes them in the background.
+
+    All feeds are fetched in parallel with conditional GETs (ETag /
+    If-Modified-Since), so unchanged feeds cost a 304 and no parsing. New or
+    changed entries are sanitized and summarized once, on the fetch thread
+    (see feed_processing), so page renders only read ready-made dicts.
+    """
+
+    def __init__(self, urls, refresh_interval=900, max_workers=4, timeout=10):
+        self.refresh_interval = refresh_interval
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._feeds = {url: {"entries": [], "etag": None, "modified": None, "fetched_at": None,
+                             "error": None} for url in urls}
+        self._session = requests.Session()
+        self._processor = EntryProcessor()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="feed-fetch")
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Load every feed once, then keep refreshing on a daemon thread."""
+        if self._thread:
+            return self
+        self.refresh()
+        self._thread = threading.Thread(target=self._run, name="feed-refresh", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._executor.shutdown(wait=False)
+
+    def refresh(self):
+        list(self._executor.map(self._refresh_one, list(self._feeds)))
+
+    def entries(self, url, limit=None):
+        with self._lock:
+            entries = self._feeds[url]["entries"]
+        return entries[:limit] if limit else list(entries)
+
+    def status(self):
+        with self._lock:
+            return {url: {"entries": len(state["entries"]), "fetched_at": state["fetched_at"],
+                          "error": state["error"]} for url, state in self._feeds.items()}
+
+    def _run(self):
+        while not self._stop.wait(self.refresh_interval):
+            self.refresh()
+
+    def _refresh_one(self, url):
+        with self._lock:
+            state = dict(self._feeds[url])
+        headers = {}
+        if state["etag"]:
+            headers["If-None-Match"] = state["etag"]
+        if state["modified"]:
+            headers["If-Modified-Since"] = state["modified"]
+
+        update = {"fetched_at": time.time(), "error": None}
+        try:
+            with span("feed.fetch", feed=url):
+                response = self._session.get(url, headers=headers, timeout=self.timeout)
+            if response.status_code != 304:
+                response.raise_for_status()
+                with span("feed.parse", feed=url):
+                    feed = feedparser.parse(response.content)
+                if feed.entries:
+                    update["entries"] = self._processor.process_all(feed.entries)
+                    update["etag"] = response.headers.get("ETag")
+                    update["modified"] = response.headers.get("Last-Modified")
+                else:
+                    # Keep the old validators so the next request refetches in
+                    # full instead of getting 304 for this empty/garbled body.
+                    update["error"] = "feed returned no entries"
+        except Exception as e:
+            # Keep serving the last good entries until the feed recovers.
+            update["error"] = str(e)
+
+        with self._lock:
+            self._feeds[url].update(update)
@@ -0,0 +1,40 @@
+"""Append-only JSONL result files that a batch job can resume.
+
+Batch jobs (main.py --batch, verse_of_day.py generate) append one JSON
+record per finished item. Before a rerun, compact_jsonl() rewrites the file
+to hold exactly one successful record per item, dropping failures (so they
+are retried instead of duplicated) and any line cut short by an interrupted
+run, and returns what is already done.
+"""
+import json
+import os
+
+
+def read_jsonl(path):
+    """Yield the records in `path`, skipping lines that don't parse."""
+    if not os.path.exists(path):
+        return
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue  # a line cut short by an interrupted run
+
+
+def compact_jsonl(path, key, done=lambda record: True):
+    """Keep the first record per key(record) for which done(record) holds.
+
+    Rewrites `path` in place (atomically) and returns {key: record}.
+    """
+    kept = {}
+    for record in read_jsonl(path):
+        if done(record):
+            kept.setdefault(key(record), record)
+    if os.path.exists(path):
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for record in kept.values():
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        os.replace(tmp, path)
+    return kept
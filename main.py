@@ -1,9 +1,38 @@
-import openai
+"""Ask the Bible assistant one question, or answer a whole file of them.
 
+    python main.py
+    python main.py --batch questions.jsonl --output answers.jsonl --workers 8 --rate 4
+
+Batch input is JSONL with a "question" per line and an optional "id" (the
+line number otherwise). Each answer is appended to the output as soon as it
+is ready, as {"id", "question", "answer", "latency_ms"} or with an "error",
+in completion order or, with --ordered, in input order. Rerunning with the
+same output file skips questions that already have an answer and retries
+the ones that failed (their error lines are dropped first), so an
+interrupted run picks up where it stopped.
+"""
+import argparse
+import functools
+import json
 import os
-openai.api_key = os.getenv("OPENAI_API_KEY")
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
-def ask_bible_question(question):
+from openai import OpenAI
+
+from jsonl_resume import compact_jsonl
+from openai_scheduler import OpenAIScheduler, get_scheduler
+from response_cache import cached_chat
+from retrieval import relevant_verses
+
+
+def get_client():
+    # Retries happen in the scheduler, against its retry budget.
+    return OpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)
+
+
+def build_messages(question):
     bible_reference = """
     Old Testament: 39 books, 929 chapters
     New Testament: 27 books, 260 chapters
@@ -13,19 +42,125 @@ def ask_bible_question(question):
     Genesis - 50, Psalms - 150, John - 21, etc.
     """
 
-    messages = [
+    # Ground the answer in the most relevant verses when the local index exists
+    verses = relevant_verses(question, k=5)
+    if verses:
+        bible_reference = "\n".join(f"{reference} — {text}" for reference, text in verses)
+
+    return [
         {"role": "system", "content": "You're a knowledgeable AI Bible assistant."},
         {"role": "user", "content": f"Use this info:\n{bible_reference}\n\nQuestion: {question}"}
     ]
 
-    response = openai.chat.completions.create(
-        model="gpt-3.5-turbo",
-        messages=messages,
-        temperature=0.7
-    )
 
-    print("\n📜 Answer:", response.choices[0].message.content)
+def answer_question(question, client, scheduler, user_id="cli"):
+    stream = functools.partial(scheduler.stream_chat, user_id=user_id)
+    return "".join(cached_chat(client, build_messages(question), stream=stream))
+
+
+def ask_bible_question(question):
+    answer = answer_question(question, get_client(), get_scheduler())
+    print("\n📜 Answer:", answer)
+
+
+# --- Batch mode ---
+class RateLimiter:
+    """Spaces calls at least 1/rate seconds apart across threads."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._lock = threading.Lock()
+        self._next = time.monotonic()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def read_questions(path):
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if line.strip():
+                item = json.loads(line)
+                yield str(item.get("id", line_number)), item["question"]
+
+
+def answered_ids(path):
+    """Ids answered by a previous run; the output is compacted to just those answers."""
+    return set(compact_jsonl(path, key=lambda result: str(result["id"]), done=lambda result: "answer" in result))
+
+
+def run_batch(input_path, output_path, workers=4, rate=2.0, ordered=False):
+    """Answer every question in input_path; returns (answered, failed, skipped)."""
+    client = get_client()
+    scheduler = OpenAIScheduler(max_concurrency=workers)
+    limiter = RateLimiter(rate)
+    done = answered_ids(output_path)
+    counts = {"answered": 0, "failed": 0, "skipped": 0}
+
+    def answer(item_id, question):
+        limiter.wait()
+        start = time.perf_counter()
+        result = {"id": item_id, "question": question}
+        try:
+            result["answer"] = answer_question(question, client, scheduler, user_id="batch")
+        except Exception as e:
+            result["error"] = f"{type(e).__name__}: {e}"
+        result["latency_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        return result
+
+    with open(output_path, "a", encoding="utf-8") as out, ThreadPoolExecutor(max_workers=workers) as pool:
+        def write(result):
+            out.write(json.dumps(result, ensure_ascii=False) + "\n")
+            out.flush()
+            counts["answered" if "answer" in result else "failed"] += 1
+            print(f"{'✅' if 'answer' in result else '⚠️'} {result['id']} ({result['latency_ms']} ms)")
+
+        # Keep only a window of questions in flight so large files stream.
+        pending, finished, next_to_write, position = {}, {}, 0, 0
+        for item_id, question in read_questions(input_path):
+            if item_id in done:
+                counts["skipped"] += 1
+                continue
+            pending[pool.submit(answer, item_id, question)] = position
+            position += 1
+            while pending and len(pending) + len(finished) >= workers * 2:
+                next_to_write = _drain(pending, finished, next_to_write, write, ordered)
+        while pending:
+            next_to_write = _drain(pending, finished, next_to_write, write, ordered)
+    return counts["answered"], counts["failed"], counts["skipped"]
+
+
+def _drain(pending, finished, next_to_write, write, ordered):
+    completed, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+    for future in completed:
+        finished[pending.pop(future)] = future.result()
+    if not ordered:
+        for position in sorted(finished):
+            write(finished.pop(position))
+        return next_to_write
+    while next_to_write in finished:
+        write(finished.pop(next_to_write))
+        next_to_write += 1
+    return next_to_write
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ask the NM2 Bible assistant questions.")
+    parser.add_argument("--batch", metavar="QUESTIONS_JSONL", help="answer every question in this file")
+    parser.add_argument("--output", default="answers.jsonl", help="where batch answers are appended")
+    parser.add_argument("--workers", type=int, default=4, help="questions answered at once")
+    parser.add_argument("--rate", type=float, default=2.0, help="max new requests per second (0 = no limit)")
+    parser.add_argument("--ordered", action="store_true", help="write answers in input order")
+    args = parser.parse_args()
 
-# Example usage
-user_input = input("🔍 Ask a Bible question: ")
-ask_bible_question(user_input)
\ No newline at end of file
+    if args.batch:
+        answered, failed, skipped = run_batch(args.batch, args.output, args.workers, args.rate, args.ordered)
+        print(f"\n📜 {answered} answered, {failed} failed, {skipped} already done → {args.output}")
+    else:
+        user_input = input("🔍 Ask a Bible question: ")
+        ask_bible_question(user_input)
@@ -0,0 +1,221 @@
+"""Timing spans around external calls and expensive renders.
+
+    with span("bible_api.fetch", book=book):
+        ...
+
+    @span("feed.parse")
+    def parse(...): ...
+
+Each span is recorded in a process-wide histogram and, when a session
+registry is bound (app.py binds one per Streamlit session), in that
+session's histogram too. Set METRICS_LOG=1 to also log every span as a JSON
+line. Process histograms are exposed in Prometheus text format by
+render_prometheus(): on /metrics in webhook.py, and from the Streamlit
+process on METRICS_PORT when it is set.
+"""
+import bisect
+import contextvars
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+logger = logging.getLogger("metrics")
+if os.getenv("METRICS_LOG"):
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.errors = 0
+
+    def observe(self, seconds, error=False):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.errors += error
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-quantile (None if empty)."""
+        if not self.count:
+            return None
+        rank, seen = q * self.count, 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class Registry:
+    """Histograms keyed by (span name, sorted labels)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._gauges = {}
+
+    def observe(self, name, labels, seconds, error=False):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(seconds, error)
+
+    def set_gauge(self, name, value, labels=None):
+        with self._lock:
+            self._gauges[(name, tuple(sorted((labels or {}).items())))] = value
+
+    def summary(self):
+        """[{span, labels, count, errors, mean_ms, p50_ms, p95_ms}] for display."""
+        with self._lock:
+            items = list(self._histograms.items())
+        rows = []
+        for (name, labels), h in sorted(items):
+            rows.append({
+                "span": name,
+                "labels": ", ".join(f"{k}={v}" for k, v in labels),
+                "count": h.count,
+                "errors": h.errors,
+                "mean_ms": round(h.sum / h.count * 1000, 1) if h.count else None,
+                "p50_ms": _ms(h.quantile(0.5)),
+                "p95_ms": _ms(h.quantile(0.95)),
+            })
+        return rows
+
+    def render_prometheus(self, metric="nm2_span_seconds"):
+        with self._lock:
+            items = sorted(self._histograms.items())
+            gauges = sorted(self._gauges.items())
+        lines = [f"# HELP {metric} Duration of instrumented spans.", f"# TYPE {metric} histogram"]
+        errors = [f"# HELP {metric}_errors_total Spans that raised.", f"# TYPE {metric}_errors_total counter"]
+        for (name, labels), h in items:
+            base = [("span", name)] + list(labels)
+            cumulative = 0
+            for bound, count in zip(h.buckets + (float("inf"),), h.counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{metric}_bucket{_labels(base + [('le', le)])} {cumulative}")
+            lines.append(f"{metric}_sum{_labels(base)} {h.sum:.6f}")
+            lines.append(f"{metric}_count{_labels(base)} {h.count}")
+            errors.append(f"{metric}_errors_total{_labels(base)} {h.errors}")
+        values = ["# TYPE nm2_gauge gauge"] if gauges else []
+        values += [f"nm2_gauge{_labels([('name', name)] + list(labels))} {value}" for (name, labels), value in gauges]
+        return "\n".join(lines + errors + values) + "\n"
+
+
+def _ms(seconds):
+    if seconds is None:
+        return None
+    return "inf" if seconds == float("inf") else round(seconds * 1000, 1)
+
+
+def _labels(pairs):
+    def escape(value):
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{escape(v)}"' for k, v in pairs) + "}"
+
+
+PROCESS = Registry()
+_session = contextvars.ContextVar("metrics_session", default=None)
+
+
+def bind_session(registry, session_id=None):
+    """Also record spans in this thread's context into `registry`."""
+    _session.set((registry, session_id))
+
+
+class _Span:
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self._start
+        # Streamlit's rerun/stop signals are BaseExceptions, not failures.
+        status = "ok" if exc_type is None else "error" if issubclass(exc_type, Exception) else "cancelled"
+        error = status == "error"
+        PROCESS.observe(self.name, self.labels, seconds, error)
+        bound = _session.get()
+        if bound:
+            bound[0].observe(self.name, self.labels, seconds, error)
+        if logger.isEnabledFor(logging.INFO):
+            record = {"span": self.name, "ms": round(seconds * 1000, 2), "status": status, **self.labels}
+            if bound and bound[1]:
+                record["session"] = bound[1]
+            if error:
+                record["error"] = repr(exc)
+            logger.info(json.dumps(record, default=str))
+        return False
+
+    def __call__(self, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _Span(self.name, self.labels):
+                return func(*args, **kwargs)
+        return wrapper
+
+
+def span(name, **labels):
+    """Time a block (`with span(...)`) or every call of a function (`@span(...)`)."""
+    return _Span(name, labels)
+
+
+def observe(name, seconds, **labels):
+    """Record a duration measured outside a span (e.g. time spent queued)."""
+    PROCESS.observe(name, labels, seconds)
+    bound = _session.get()
+    if bound:
+        bound[0].observe(name, labels, seconds)
+
+
+def set_gauge(name, value, **labels):
+    PROCESS.set_gauge(name, value, labels)
+
+
+def render_prometheus():
+    return PROCESS.render_prometheus()
+
+
+# --- Standalone endpoint ---
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        data = render_prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", PROMETHEUS_CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port, host="0.0.0.0"):
+    """Serve /metrics for this process on a daemon thread."""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
@@ -0,0 +1,255 @@
+"""Process-wide scheduler for OpenAI calls.
+
+Every chat stream and summary from every session goes through one
+OpenAIScheduler, which:
+
+- runs at most `max_concurrency` calls at a time;
+- queues the rest per user and serves users round-robin, so one busy
+  session can't starve the others;
+- coalesces identical in-flight chat requests: a second asker follows the
+  first request's stream instead of starting another;
+- retries rate limits (429), 5xx and connection errors with jittered
+  exponential backoff (honouring Retry-After), but only before anything has
+  been streamed, and only while the shared retry budget lasts, so a real
+  outage fails fast instead of multiplying traffic;
+- reports queue depth and in-flight gauges and a queue-wait histogram
+  through metrics.
+
+The OpenAI client should be created with max_retries=0 so retries happen
+here, where they are counted against the budget.
+"""
+import os
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+
+import openai
+
+from chat_stream import MODEL, TEMPERATURE, stream_chat
+from metrics import observe, set_gauge
+from response_cache import cache_key
+
+RETRYABLE = (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)
+
+
+def _retry_after(error):
+    response = getattr(error, "response", None)
+    try:
+        return float(response.headers.get("retry-after")) if response is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryBudget:
+    """Every request earns `ratio` of a retry, up to `max_tokens` banked."""
+
+    def __init__(self, ratio=0.2, max_tokens=20):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def withdraw(self):
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+class _Job:
+    def __init__(self, user_id, key, fn, lock):
+        self.user_id = user_id
+        self.key = key
+        self.fn = fn
+        self.cond = threading.Condition(lock)
+        self.items = []
+        self.done = False
+        self.error = None
+        self.subscribers = 0
+        self.submitted_at = time.monotonic()
+        self.started_at = None
+
+
+class OpenAIScheduler:
+    def __init__(self, max_concurrency=4, max_retries=4, base_delay=0.5, max_delay=20.0, budget=None):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget or RetryBudget()
+        self._lock = threading.Lock()
+        self._work = threading.Condition(self._lock)
+        self._queues = OrderedDict()  # user id -> deque of jobs, in round-robin order
+        self._inflight = {}  # coalescing key -> job
+        self._running = 0
+        self._counters = {"submitted": 0, "coalesced": 0, "retries": 0, "budget_exhausted": 0,
+                          "failed": 0, "cancelled": 0}
+        for i in range(max_concurrency):
+            threading.Thread(target=self._worker, name=f"openai-{i}", daemon=True).start()
+
+    # --- Public API ---
+    def stream_chat(self, client, messages, model=MODEL, temperature=TEMPERATURE, user_id=None):
+        """Scheduled drop-in for chat_stream.stream_chat."""
+        return self.stream(
+            user_id, lambda: stream_chat(client, messages, model=model, temperature=temperature),
+            key=cache_key(messages, model, temperature),
+        )
+
+    def call(self, user_id, fn):
+        """Run fn() (a non-streaming request) under the scheduler; returns its result."""
+        results = self.stream(user_id, lambda: iter([fn()]))
+        try:
+            return next(results)
+        finally:
+            results.close()
+
+    def stream(self, user_id, fn, key=None):
+        """Yield what the iterator returned by fn() yields, once scheduled.
+
+        Requests with the same `key` that overlap share one underlying call.
+        """
+        job = self._submit(user_id, fn, key)
+        seen, waited = 0, False
+        try:
+            while True:
+                with job.cond:
+                    while seen == len(job.items) and not job.done:
+                        job.cond.wait()
+                    items = job.items[seen:]
+                    seen += len(items)
+                    done, started_at = job.done, job.started_at
+                if not waited and started_at is not None:
+                    observe("openai.queue_wait", started_at - job.submitted_at)
+                    waited = True
+                yield from items
+                if done and seen == len(job.items):
+                    break
+            if job.error:
+                raise job.error
+        finally:
+            with self._lock:
+                job.subscribers -= 1
+                if job.subscribers == 0 and not job.done and self._inflight.get(job.key) is job:
+                    del self._inflight[job.key]  # abandoned; later askers get a fresh call
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats["queued"] = sum(len(q) for q in self._queues.values())
+            stats["running"] = self._running
+        return stats
+
+    # --- Internals ---
+    def _submit(self, user_id, fn, key):
+        with self._lock:
+            job = self._inflight.get(key) if key else None
+            if job:
+                self._counters["coalesced"] += 1
+            else:
+                job = _Job(user_id, key, fn, self._lock)
+                if key:
+                    self._inflight[key] = job
+                self._queues.setdefault(user_id, deque()).append(job)
+                self._counters["submitted"] += 1
+                self._publish_gauges()
+                self._work.notify()
+                self.budget.deposit()
+            job.subscribers += 1
+        return job
+
+    def _next_job(self):
+        # Called with the lock held: take the first user's oldest job and move
+        # that user to the back of the line.
+        user_id, queue = next(iter(self._queues.items()))
+        job = queue.popleft()
+        del self._queues[user_id]
+        if queue:
+            self._queues[user_id] = queue
+        return job
+
+    def _publish_gauges(self):
+        set_gauge("openai.queue_depth", sum(len(q) for q in self._queues.values()))
+        set_gauge("openai.running", self._running)
+
+    def _worker(self):
+        while True:
+            with self._lock:
+                while not self._queues:
+                    self._work.wait()
+                job = self._next_job()
+                if job.subscribers == 0:
+                    self._finish(job, cancelled=True)
+                    continue
+                self._running += 1
+                job.started_at = time.monotonic()
+                self._publish_gauges()
+            try:
+                self._run(job)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._finish(job)
+
+    def _finish(self, job, cancelled=False):
+        # Called with the lock held.
+        if cancelled:
+            self._counters["cancelled"] += 1
+        elif job.error:
+            self._counters["failed"] += 1
+        if job.key and self._inflight.get(job.key) is job:
+            del self._inflight[job.key]
+        job.done = True
+        job.cond.notify_all()
+        self._publish_gauges()
+
+    def _run(self, job):
+        for attempt in range(self.max_retries + 1):
+            iterator = None
+            try:
+                iterator = iter(job.fn())
+                for item in iterator:
+                    with self._lock:
+                        if job.subscribers == 0:
+                            self._counters["cancelled"] += 1
+                            return  # everyone left; the finally closes the stream
+                        job.items.append(item)
+                        job.cond.notify_all()
+                return
+            except Exception as e:
+                if not self._should_retry(job, e, attempt):
+                    job.error = e
+                    return
+                delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+                time.sleep(max(delay, min(_retry_after(e) or 0, self.max_delay)))
+            finally:
+                close = getattr(iterator, "close", None)
+                if close:
+                    close()
+
+    def _should_retry(self, job, error, attempt):
+        if job.items or not isinstance(error, RETRYABLE) or attempt == self.max_retries:
+            return False
+        if not self.budget.withdraw():
+            with self._lock:
+                self._counters["budget_exhausted"] += 1
+            return False
+        with self._lock:
+            self._counters["retries"] += 1
+        return True
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = OpenAIScheduler(max_concurrency=int(os.getenv("OPENAI_MAX_CONCURRENCY", "4")))
+        return _scheduler
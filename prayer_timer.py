@@ -0,0 +1,23 @@
+import os
+import time
+
+import streamlit.components.v1 as components
+
+_component = components.declare_component(
+    "prayer_timer",
+    path=os.path.join(os.path.dirname(os.path.abspath(__file__)), "components", "prayer_timer"),
+)
+
+
+def prayer_timer(end_time, message="", key=None):
+    """Show a countdown to end_time (epoch seconds) that runs in the browser.
+
+    The server is not involved while it counts down. Each render sends the
+    time left by the server's clock, and the browser counts that down on its
+    own clock, so a device clock that is off doesn't shorten or stretch it.
+    Returns end_time once the countdown has finished, otherwise None.
+    """
+    end_ms = int(end_time * 1000)
+    remaining_ms = max(0, end_ms - int(time.time() * 1000))
+    value = _component(end_time=end_ms, remaining_ms=remaining_ms, message=message, key=key, default=None)
+    return end_time if value == end_ms else None
@@ -0,0 +1,154 @@
+import hashlib
+import json
+import re
+import threading
+import time
+
+import db
+from chat_stream import MODEL, TEMPERATURE, stream_chat
+
+
+def normalize(text):
+    """Case-, whitespace- and trailing-punctuation-insensitive form of a prompt."""
+    return re.sub(r"\s+", " ", text).strip().lower().rstrip("?!. ")
+
+
+def cache_key(messages, model, temperature):
+    payload = [model, temperature, [(m["role"], normalize(m["content"])) for m in messages]]
+    return hashlib.sha256(json.dumps(payload).encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """SQLite-backed completion cache with TTL and least-recently-used eviction.
+
+    Hit, miss and eviction counts are kept in cache.db next to the entries
+    (written with the cache's own commits), so stats() covers every process
+    that has used the cache, including `python response_cache.py`.
+    """
+
+    def __init__(self, path=db.CACHE_DB_PATH, max_entries=10000, ttl=7 * 24 * 3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._pending = {"hits": 0, "misses": 0, "evictions": 0}  # not yet in response_cache_stats
+        self._conn = db.connect(path)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS response_cache (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_response_cache_access ON response_cache(last_access)"
+        )
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS response_cache_stats (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        self._conn.commit()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM response_cache WHERE key = ? AND created_at > ?",
+                (key, now - self.ttl),
+            ).fetchone()
+            if not row:
+                self._pending["misses"] += 1  # saved with the put() that usually follows
+                return None
+            self._conn.execute(
+                "UPDATE response_cache SET last_access = ?, hits = hits + 1 WHERE key = ?", (now, key)
+            )
+            self._pending["hits"] += 1
+            self._save_counters()
+            self._conn.commit()
+            return row[0]
+
+    def put(self, key, model, response):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO response_cache (key, model, response, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, model, response, now, now),
+            )
+            self._conn.execute("DELETE FROM response_cache WHERE created_at <= ?", (now - self.ttl,))
+            count = self._conn.execute("SELECT COUNT(*) FROM response_cache").fetchone()[0]
+            if count > self.max_entries:
+                excess = count - self.max_entries
+                self._conn.execute(
+                    "DELETE FROM response_cache WHERE key IN "
+                    "(SELECT key FROM response_cache ORDER BY last_access LIMIT ?)",
+                    (excess,),
+                )
+                self._pending["evictions"] += excess
+            self._save_counters()
+            self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            self._save_counters()
+            self._conn.commit()
+            stats = {"hits": 0, "misses": 0, "evictions": 0}
+            stats.update(self._conn.execute("SELECT name, value FROM response_cache_stats"))
+            entries = self._conn.execute("SELECT COUNT(*) FROM response_cache").fetchone()[0]
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        stats["entries"] = entries
+        return stats
+
+    def _save_counters(self):
+        # Called with the lock held, before a commit.
+        for name, value in self._pending.items():
+            if value:
+                self._conn.execute(
+                    "INSERT INTO response_cache_stats (name, value) VALUES (?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+                    (name, value),
+                )
+                self._pending[name] = 0
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache()
+        return _cache
+
+
+def cached_chat(client, messages, model=MODEL, temperature=TEMPERATURE, cache=None, stream=stream_chat):
+    """Yield the answer to `messages`, from the cache when possible.
+
+    A hit yields the whole answer at once. A miss streams from the API (via
+    `stream`, which takes stream_chat's arguments) and stores the answer only
+    if the stream completes.
+    """
+    cache = cache or get_response_cache()
+    key = cache_key(messages, model, temperature)
+    cached = cache.get(key)
+    if cached is not None:
+        yield cached
+        return
+    parts = []
+    for delta in stream(client, messages, model=model, temperature=temperature):
+        parts.append(delta)
+        yield delta
+    if parts:
+        cache.put(key, model, "".join(parts))
+
+
+if __name__ == "__main__":
+    for name, value in get_response_cache().stats().items():
+        print(f"{name}: {value}")
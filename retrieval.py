@@ -0,0 +1,202 @@
+"""BM25 verse retrieval over the local corpus.
+
+The index is a term-major sparse matrix of precomputed BM25 weights
+(indptr / doc ids / weights, as in CSC), saved with numpy so loading is a
+few array reads. A query gathers the postings of its terms and sums them
+with one np.bincount, so scoring is vectorized over the whole corpus.
+
+    python retrieval.py build            # after importing bible_corpus.bin
+    python retrieval.py search "peace that passes understanding"
+    python retrieval.py bench
+"""
+import argparse
+import functools
+import os
+import re
+import time
+from collections import Counter
+
+import numpy as np
+
+from bible_corpus import load_corpus
+
+INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bible_index.npz")
+
+STOPWORDS = set("""
+a an and are as at be but by for from he her him his i in is it its me my not of on or our
+shall she so that the thee their them there they thou thy to unto us was we were what which
+who will with ye you your hath have had upon all this these those into out when then than
+""".split())
+_WORD = re.compile(r"[a-z]+")
+
+
+def tokenize(text):
+    return [w for w in _WORD.findall(text.lower()) if w not in STOPWORDS and len(w) > 1]
+
+
+class VerseIndex:
+    def __init__(self, vocab, indptr, doc_ids, weights, books, refs):
+        self.vocab = {term: i for i, term in enumerate(vocab)}
+        self.indptr = indptr
+        self.doc_ids = doc_ids
+        self.weights = weights
+        self.books = list(books)
+        self.refs = refs  # (n_docs, 3) uint16: book index, chapter, verse
+
+    @classmethod
+    def build(cls, docs, books, k1=1.5, b=0.75):
+        """docs: iterable of ((book_index, chapter, verse), text)."""
+        refs, postings, lengths, vocab = [], {}, [], {}
+        for doc_id, (ref, text) in enumerate(docs):
+            refs.append(ref)
+            terms = tokenize(text)
+            lengths.append(len(terms))
+            for term, tf in Counter(terms).items():
+                postings.setdefault(vocab.setdefault(term, len(vocab)), []).append((doc_id, tf))
+
+        n_docs = len(refs)
+        lengths = np.asarray(lengths, dtype=np.float32)
+        norm = k1 * (1 - b + b * lengths / max(lengths.mean(), 1.0))
+        indptr = np.zeros(len(vocab) + 1, dtype=np.int64)
+        doc_ids, weights = [], []
+        for term_id in range(len(vocab)):
+            docs_tf = np.asarray(postings[term_id], dtype=np.float32)
+            ids, tf = docs_tf[:, 0].astype(np.int32), docs_tf[:, 1]
+            idf = np.log(1 + (n_docs - len(ids) + 0.5) / (len(ids) + 0.5))
+            doc_ids.append(ids)
+            weights.append((idf * tf * (k1 + 1) / (tf + norm[ids])).astype(np.float32))
+            indptr[term_id + 1] = indptr[term_id] + len(ids)
+
+        return cls(
+            list(vocab),
+            indptr,
+            np.concatenate(doc_ids) if doc_ids else np.zeros(0, dtype=np.int32),
+            np.concatenate(weights) if weights else np.zeros(0, dtype=np.float32),
+            books,
+            np.asarray(refs, dtype=np.uint16).reshape(-1, 3),
+        )
+
+    @classmethod
+    def from_corpus(cls, corpus):
+        return cls.build(_corpus_docs(corpus), list(corpus.book_chapters))
+
+    def save(self, path=INDEX_PATH):
+        np.savez(
+            path,
+            vocab=np.asarray(list(self.vocab)),
+            indptr=self.indptr,
+            doc_ids=self.doc_ids,
+            weights=self.weights,
+            books=np.asarray(self.books),
+            refs=self.refs,
+        )
+
+    @classmethod
+    def load(cls, path=INDEX_PATH):
+        with np.load(path) as data:
+            return cls(data["vocab"].tolist(), data["indptr"], data["doc_ids"], data["weights"],
+                       data["books"].tolist(), data["refs"])
+
+    def search(self, query, k=5):
+        """Return the top-k (score, (book, chapter, verse)) matches for query."""
+        term_ids = [self.vocab[t] for t in set(tokenize(query)) if t in self.vocab]
+        if not term_ids:
+            return []
+        spans = [slice(self.indptr[t], self.indptr[t + 1]) for t in term_ids]
+        ids = np.concatenate([self.doc_ids[s] for s in spans])
+        scores = np.bincount(ids, weights=np.concatenate([self.weights[s] for s in spans]),
+                             minlength=len(self.refs))
+        k = min(k, np.count_nonzero(scores))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(float(scores[i]), (self.books[self.refs[i][0]], int(self.refs[i][1]), int(self.refs[i][2])))
+                for i in top]
+
+
+def _corpus_docs(corpus):
+    for book_index, book in enumerate(corpus.book_chapters):
+        for chapter in range(1, corpus.book_chapters[book] + 1):
+            for verse in corpus.get_chapter(book, chapter):
+                yield (book_index, chapter, verse["verse"]), verse["text"]
+
+
+def load_index(path=INDEX_PATH):
+    """Load the saved index, or return None if it hasn't been built."""
+    if not os.path.exists(path):
+        return None
+    return VerseIndex.load(path)
+
+
+@functools.lru_cache(maxsize=1)
+def _defaults():
+    return load_index(), load_corpus()
+
+
+def relevant_verses(question, k=5, index=None, corpus=None):
+    """Return [(reference, text)] for the verses most relevant to question."""
+    if index is None or corpus is None:
+        default_index, default_corpus = _defaults()
+        index, corpus = index or default_index, corpus or default_corpus
+    if not index or not corpus:
+        return []
+    return [(f"{book} {chapter}:{verse}", corpus.get_verse(book, chapter, verse))
+            for _, (book, chapter, verse) in index.search(question, k)]
+
+
+# --- Benchmark ---
+def _synthetic_docs(n_docs, vocab_size=12000, seed=0):
+    rng = np.random.default_rng(seed)
+    words = ["w" + "".join(chr(97 + int(d)) for d in str(i)) for i in range(vocab_size)]
+    ranks = rng.zipf(1.3, size=n_docs * 25) % vocab_size
+    for i in range(n_docs):
+        yield (0, 1 + i // 200, 1 + i % 200), " ".join(words[r] for r in ranks[i * 25:(i + 1) * 25])
+
+
+def bench(sizes=(1000, 5000, 10000, 31102), queries=200):
+    corpus = load_corpus()
+    if corpus:
+        texts, books, source = list(_corpus_docs(corpus)), list(corpus.book_chapters), "corpus"
+    else:
+        texts, books, source = list(_synthetic_docs(max(sizes))), ["Genesis"], "synthetic"
+    rng = np.random.default_rng(1)
+    print(f"BM25 query latency ({source} documents, {queries} queries per size)")
+    print(f"{'docs':>8} {'build s':>8} {'mean ms':>8} {'p95 ms':>8}")
+    for size in sizes:
+        subset = texts[:size]
+        start = time.perf_counter()
+        index = VerseIndex.build(subset, books)
+        build_time = time.perf_counter() - start
+        picks = rng.integers(0, len(subset), size=queries)
+        timings = []
+        for i in picks:
+            query = " ".join(subset[i][1].split()[:6])
+            start = time.perf_counter()
+            index.search(query, k=5)
+            timings.append((time.perf_counter() - start) * 1000)
+        print(f"{len(subset):>8} {build_time:>8.2f} {np.mean(timings):>8.3f} {np.percentile(timings, 95):>8.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build, query or benchmark the verse index.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("build")
+    search = sub.add_parser("search")
+    search.add_argument("query")
+    search.add_argument("-k", type=int, default=5)
+    sub.add_parser("bench")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        corpus = load_corpus()
+        if not corpus:
+            raise SystemExit("Import a translation first: python bible_corpus.py <file>")
+        index = VerseIndex.from_corpus(corpus)
+        index.save()
+        print(f"✅ Indexed {len(index.refs)} verses into {INDEX_PATH}")
+    elif args.command == "search":
+        for reference, text in relevant_verses(args.query, args.k):
+            print(f"{reference} — {text}")
+    else:
+        bench()
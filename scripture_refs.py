@@ -0,0 +1,176 @@
+"""Find scripture references in chat answers and look up their text.
+
+Every spelling of every book (full names, BOOK_ALIASES, common
+abbreviations, "1 John" / "1John" / "I John") is compiled into one regex
+when the module is imported, nested by shared prefix so a position that
+can't start a book name is rejected after a character or two. Scanning an
+answer is a single pass:
+
+    >>> [r.label for r in find_references("See Prov. 3:5-6 and 1 Jn 4:8.")]
+    ['Proverbs 3:5-6', '1 John 4:8']
+
+Matching ignores case ("john 3:16" counts). Only chapter:verse references
+are picked up ("John 3" alone is too easy to match in ordinary prose); a
+range may run into a later chapter ("Mark 3:16-4:2"), up to
+MAX_RANGE_CHAPTERS chapters. resolve() then looks up everything found, in
+one message or a whole page of them, in one go: verses come from the local
+corpus when it has been imported, otherwise each distinct chapter is read
+once from the chapter cache, all at the same time.
+"""
+import re
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from bible_books import BOOK_ALIASES, BOOK_CHAPTERS
+
+Reference = namedtuple("Reference", "book chapter start end_chapter end label")
+
+MAX_RANGE_CHAPTERS = 3
+
+_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="scripture-refs")
+
+ABBREVIATIONS = {
+    "Genesis": ["Gen", "Gn"], "Exodus": ["Exod", "Ex"], "Leviticus": ["Lev", "Lv"],
+    "Numbers": ["Num", "Nm"], "Deuteronomy": ["Deut", "Dt"], "Joshua": ["Josh"],
+    "Judges": ["Judg", "Jdg"], "1 Samuel": ["Sam", "Sm"], "1 Kings": ["Kgs", "Kin"],
+    "1 Chronicles": ["Chron", "Chr"], "Nehemiah": ["Neh"], "Esther": ["Esth", "Est"],
+    "Psalms": ["Ps", "Psa", "Pss"], "Proverbs": ["Prov", "Prv", "Pr"], "Ecclesiastes": ["Eccl", "Eccles", "Ecc"],
+    "Song of Solomon": ["Song", "SoS"], "Isaiah": ["Isa"], "Jeremiah": ["Jer"],
+    "Lamentations": ["Lam"], "Ezekiel": ["Ezek", "Eze"], "Daniel": ["Dan", "Dn"], "Hosea": ["Hos"],
+    "Obadiah": ["Obad", "Ob"], "Jonah": ["Jon"], "Micah": ["Mic"], "Nahum": ["Nah"],
+    "Habakkuk": ["Hab"], "Zephaniah": ["Zeph"], "Haggai": ["Hag"], "Zechariah": ["Zech"],
+    "Malachi": ["Mal"], "Matthew": ["Matt", "Mt"], "Mark": ["Mk", "Mrk"], "Luke": ["Lk"],
+    "John": ["Jn", "Jhn"], "Romans": ["Rom"], "1 Corinthians": ["Cor"], "Galatians": ["Gal"],
+    "Ephesians": ["Eph"], "Philippians": ["Phil", "Php"], "Colossians": ["Col"],
+    "1 Thessalonians": ["Thess", "Thes"], "1 Timothy": ["Tim"], "Philemon": ["Phlm", "Philem"],
+    "Hebrews": ["Heb"], "James": ["Jas"], "1 Peter": ["Pet", "Pt"], "Jude": ["Jud"],
+    "Revelation": ["Rev"],
+}
+_NUMBERS = {"1": ("1", "I", "First"), "2": ("2", "II", "Second"), "3": ("3", "III", "Third")}
+
+
+def _spellings():
+    """Map every accepted spelling of a book to its BOOK_CHAPTERS name."""
+    names = {}
+    for book in BOOK_CHAPTERS:
+        forms = [book] + ABBREVIATIONS.get(book, [])
+        forms += [alias for alias, name in BOOK_ALIASES.items() if name == book]
+        number, _, rest = book.partition(" ")
+        if number in _NUMBERS:
+            # "1 Sam", "1Sam", "I Sam", "First Samuel"; abbreviations listed
+            # under "1 X" (or plain "X", for John) serve 2 and 3 as well.
+            stems = [rest] + ABBREVIATIONS.get("1 " + rest, ABBREVIATIONS.get(rest, []))
+            forms = [f"{prefix} {stem}" for prefix in _NUMBERS[number] for stem in stems]
+            forms += [f"{number}{stem}" for stem in stems]
+        for form in forms:
+            names[form] = book
+    return names
+
+
+def _trie_pattern(words):
+    """A regex matching any of `words`, branching on shared prefixes."""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        optional = "" in node
+        body = branches[0] if len(branches) == 1 and not optional else "(?:" + "|".join(branches) + ")"
+        return body + "?" if optional else body
+
+    return build(trie)
+
+
+BOOK_SPELLINGS = _spellings()
+_LOOKUP = {name.lower(): book for name, book in BOOK_SPELLINGS.items()}
+_PATTERN = re.compile(
+    r"(?<![\w-])(?P<book>" + _trie_pattern(BOOK_SPELLINGS)
+    + r")\.?\s+(?P<chapter>\d{1,3}):(?P<start>\d{1,3})"
+    r"(?:\s*[-–]\s*(?:(?P<end_chapter>\d{1,3}):)?(?P<end>\d{1,3}))?(?![\w:])",
+    re.IGNORECASE,
+)
+
+
+def find_references(text):
+    """Distinct, valid references in `text`, in order of first appearance."""
+    found = {}
+    for match in _PATTERN.finditer(text):
+        book = _LOOKUP[match.group("book").lower()]
+        chapter, start = int(match.group("chapter")), int(match.group("start"))
+        end_chapter = int(match.group("end_chapter") or chapter)
+        end = int(match.group("end")) if match.group("end") else start
+        if not 1 <= chapter <= end_chapter <= BOOK_CHAPTERS[book] or start < 1 or end < 1:
+            continue
+        if end_chapter - chapter >= MAX_RANGE_CHAPTERS or (end_chapter == chapter and end < start):
+            continue
+        if end_chapter > chapter:
+            label = f"{book} {chapter}:{start}-{end_chapter}:{end}"
+        else:
+            label = f"{book} {chapter}:{start}-{end}" if end > start else f"{book} {chapter}:{start}"
+        found.setdefault(label, Reference(book, chapter, start, end_chapter, end, label))
+    return list(found.values())
+
+
+def _in_range(ref, chapter, verse):
+    return (chapter > ref.chapter or verse >= ref.start) and (chapter < ref.end_chapter or verse <= ref.end)
+
+
+def _format(ref, verses):
+    if len(verses) == 1:
+        return " ".join(verses[0]["text"].split())
+    crosses = ref.end_chapter > ref.chapter
+    return " ".join(
+        (f"{v['chapter']}:{v['verse']} " if crosses else f"{v['verse']} ") + " ".join(v["text"].split())
+        for v in verses
+    )
+
+
+def resolve(references, corpus=None, chapter_cache=None):
+    """{label: verse text} for every reference that could be looked up."""
+    texts, pending, chapters = {}, [], set()
+    for ref in references:
+        verses = [
+            verse
+            for chapter in range(ref.chapter, ref.end_chapter + 1)
+            for verse in corpus.get_verses(ref.book, chapter,
+                                           ref.start if chapter == ref.chapter else 1,
+                                           ref.end if chapter == ref.end_chapter else None)
+        ] if corpus else []
+        if verses:
+            texts[ref.label] = _format(ref, verses)
+        else:
+            pending.append(ref)
+            chapters.update((ref.book, chapter) for chapter in range(ref.chapter, ref.end_chapter + 1))
+    if pending and chapter_cache:
+        # One read per distinct chapter, all at once, however many references cite it.
+        keys = list(chapters)
+        loaded = dict(zip(keys, _pool.map(lambda key: chapter_cache.get(*key), keys)))
+        for ref in pending:
+            verses = [
+                dict(v, chapter=chapter)
+                for chapter in range(ref.chapter, ref.end_chapter + 1)
+                for v in (loaded[(ref.book, chapter)] or {}).get("verses", [])
+                if _in_range(ref, chapter, v["verse"])
+            ]
+            if verses:
+                texts[ref.label] = _format(ref, verses)
+    return texts
+
+
+def expand_references(texts, corpus=None, chapter_cache=None):
+    """For each of `texts`, [(label, verse text)] for its references, in order.
+
+    The references of every text are looked up together, so a page of
+    answers costs one resolve(), not one per answer.
+    """
+    found = [find_references(text) for text in texts]
+    if not any(found):
+        return [[] for _ in found]
+    verses = resolve([ref for refs in found for ref in refs], corpus, chapter_cache)
+    return [[(ref.label, verses[ref.label]) for ref in refs if ref.label in verses] for refs in found]
@@ -0,0 +1,144 @@
+import functools
+import html
+import logging
+import os
+import uuid
+from datetime import date
+
+import streamlit as st
+from openai import OpenAI
+
+from chat_context import ConversationContext, openai_summarizer
+from chat_history import HistoryStore
+from chat_stream import render_stream
+from openai_scheduler import get_scheduler
+from response_cache import cached_chat
+from scripture_refs import expand_references
+from sections.reading_room import get_chapter_cache, get_corpus
+from token_meter import TokenMeter
+from transcript import Transcript, render_transcript
+from verse_of_day import load_verses, verse_for
+
+logger = logging.getLogger(__name__)
+
+
+# --- Data Loaders ---
+@st.cache_resource
+def get_client():
+    # Retries happen in the shared scheduler, against its retry budget.
+    return OpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)
+
+@st.cache_resource
+def get_history_store():
+    return HistoryStore()
+
+@st.cache_resource
+def get_verses_of_day():
+    return load_verses()
+
+@st.cache_resource
+def get_token_meter():
+    return TokenMeter()
+
+
+def with_references(messages):
+    """Copies of `messages` with the scripture each assistant message cites, looked up in one batch."""
+    answers = [i for i, m in enumerate(messages) if m["role"] == "assistant"]
+    found = expand_references([messages[i]["content"] for i in answers], get_corpus(), get_chapter_cache())
+    messages = list(messages)
+    for i, references in zip(answers, found):
+        messages[i] = dict(messages[i], references=references)
+    return messages
+
+
+def init_session():
+    # The user id lives in the URL so a reconnect resumes the same conversation.
+    if "user_id" not in st.session_state:
+        st.session_state.user_id = st.query_params.get("uid") or uuid.uuid4().hex
+        st.query_params["uid"] = st.session_state.user_id
+
+    if "messages" not in st.session_state:
+        st.session_state.messages, st.session_state.history_cursor = get_history_store().load_page(
+            st.session_state.user_id
+        )
+        # What is drawn; older pages join it but are never sent to the model.
+        st.session_state.transcript = Transcript()
+        st.session_state.transcript.extend(with_references(st.session_state.messages))
+
+
+# --- Bible Chat Experience ---
+def render():
+    init_session()
+    client = get_client()
+    st.title("NM2 Bible Chat")
+    st.markdown("Welcome, beloved seeker. This tool was built with prayer and purpose — to guide hearts, encourage reflection, and honor God's Word.")
+
+    st.markdown("""
+    <div class='donation-cta'>
+    If this ministry blesses you, consider <a href='https://buy.stripe.com/28EfZg6hD1Lk0zsg7pdZ602' target='_blank'>supporting our mission</a>.  
+    Your gift helps us serve more hearts through the Word.
+    </div>
+    """, unsafe_allow_html=True)
+
+    # Precomputed per calendar day (see verse_of_day.py), so it stays put all day.
+    chosen = verse_for(date.today(), get_verses_of_day())
+    st.markdown(f"<div class='verse-box'>{html.escape(chosen['verse'])}</div>", unsafe_allow_html=True)
+    with st.expander("📖 Teach me more"):
+        st.markdown(chosen["teaching"])
+    with st.expander("🙏 A short prayer"):
+        st.markdown("""Lord, may Your Word take root in my heart today.  
+        Guide me, teach me, and help me walk with grace.  
+        Thank You for being near, even in silence. Amen.""")
+
+    prompt = st.chat_input("What’s on your heart today?")
+
+    transcript = st.session_state.transcript
+    if (transcript.hidden or st.session_state.history_cursor) and st.button("Show earlier messages"):
+        if transcript.hidden:
+            transcript.show_more()
+        else:
+            older, st.session_state.history_cursor = get_history_store().load_page(
+                st.session_state.user_id, before=st.session_state.history_cursor
+            )
+            transcript.prepend(with_references(older))
+
+    # Only the newest window is drawn, as one element.
+    view = st.empty()
+    render_transcript(transcript, view)
+
+    if prompt and not get_token_meter().consume(st.session_state.user_id):
+        st.warning("You've used today's free messages. They refill tomorrow — or "
+                   "[support the mission](https://buy.stripe.com/28EfZg6hD1Lk0zsg7pdZ602) to keep chatting.")
+        prompt = None
+
+    if prompt:
+        st.session_state.messages.append({"role": "user", "content": prompt})
+        get_history_store().append(st.session_state.user_id, "user", prompt)
+        transcript.append("user", prompt)
+        render_transcript(transcript, view)
+        if "chat_context" not in st.session_state:
+            st.session_state.chat_context = ConversationContext(openai_summarizer(
+                client, call=functools.partial(get_scheduler().call, st.session_state.user_id)
+            ))
+        history = st.session_state.chat_context.build(st.session_state.messages)
+
+        # Stream the answer token by token; it is only saved once complete.
+        placeholder = st.empty()
+        placeholder.markdown("📖 Listening for heavenly wisdom...")
+        stream = functools.partial(get_scheduler().stream_chat, user_id=st.session_state.user_id)
+        response, error = render_stream(cached_chat(client, history, stream=stream), placeholder)
+        if error:
+            # Details go to the log; the error text never enters the conversation.
+            logger.error("Chat stream failed for %s", st.session_state.user_id, exc_info=error)
+            if not response:
+                get_token_meter().refund(st.session_state.user_id)
+        if response:
+            st.session_state.messages.append({"role": "assistant", "content": response})
+            get_history_store().append(st.session_state.user_id, "assistant", response)
+            transcript.append("assistant", response,
+                              expand_references([response], get_corpus(), get_chapter_cache())[0])
+            render_transcript(transcript, view)
+        placeholder.empty()
+        if error:
+            st.error("⚠️ Something went wrong while answering"
+                     + (" — the answer above may be incomplete." if response else ". Please try again."))
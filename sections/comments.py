@@ -0,0 +1,124 @@
+import html
+import os
+
+import streamlit as st
+
+from comments_store import CommentsStore, SQLiteCommentsBackend, SupabaseCommentsBackend
+from supabase_client import get_supabase, supabase_configured
+
+PAGE_SIZE = 10
+
+
+# --- Data Loaders ---
+@st.cache_resource
+def get_comments_store():
+    if os.getenv("COMMENTS_BACKEND") == "supabase" and supabase_configured():
+        return CommentsStore(SupabaseCommentsBackend(get_supabase()))
+    return CommentsStore(SQLiteCommentsBackend())
+
+
+# --- Comments and Feedback ---
+def render():
+    st.header("💬 Community Comments & Reflections")
+
+    # Modern comment input area
+    st.markdown("""
+    <style>
+    .comment-card {
+        background: #fff;
+        border-radius: 12px;
+        box-shadow: 0 2px 8px rgba(0,0,0,0.06);
+        padding: 1em 1.2em;
+        margin-bottom: 1.2em;
+        font-family: 'Inter', sans-serif;
+    }
+    .comment-meta {
+        color: #7c7c7c;
+        font-size: 0.98em;
+        margin-bottom: 0.3em;
+        font-family: 'Inter', sans-serif;
+    }
+    .comment-actions {
+        margin-top: 0.5em;
+    }
+    </style>
+    """, unsafe_allow_html=True)
+
+    store = get_comments_store()
+
+    if "edit_id" not in st.session_state:
+        st.session_state.edit_id = None
+    if "my_comments" not in st.session_state:
+        st.session_state.my_comments = set()  # ids this visitor may edit
+        st.session_state.comment_posts = []   # inserts still in flight
+        st.session_state.comment_pages = 1
+
+    # Comments become editable by their author once the background insert lands.
+    for future in [f for f in st.session_state.comment_posts if f.done()]:
+        st.session_state.comment_posts.remove(future)
+        if future.exception():
+            st.error("Sorry, your comment could not be saved. Please try again.")
+        else:
+            st.session_state.my_comments.add(future.result()["id"])
+
+    # --- Input fields for name and comment ---
+    col_name, col_comment = st.columns([1, 3])
+    with col_name:
+        name = st.text_input("Your Name", key="comment_name")
+    with col_comment:
+        comment = st.text_area("Share your thoughts, prayers, or encouragement:", key="comment_input")
+
+    if st.button("Post Comment"):
+        if comment.strip():
+            st.session_state.comment_posts.append(store.post(name.strip() or "Anonymous", comment.strip()))
+            st.success("Thank you for sharing!")
+            st.rerun()
+
+    st.markdown("#### Recent Comments:")
+
+    comments, cursor = [], None
+    for _ in range(st.session_state.comment_pages):
+        page, cursor = store.page(before=cursor, limit=PAGE_SIZE)
+        comments += page
+        if cursor is None:
+            break
+
+    for c in comments:
+        comment_id = c["id"]
+
+        st.markdown("<div class='comment-card'>", unsafe_allow_html=True)
+        if comment_id is not None and st.session_state.edit_id == comment_id:
+            st.markdown("<div class='comment-meta'><b>Edit your comment</b></div>", unsafe_allow_html=True)
+            new_name = st.text_input("Edit your name:", value=c["name"], key=f"edit_name_{comment_id}")
+            new_text = st.text_area("Edit your comment:", value=c["text"], key=f"edit_{comment_id}")
+            col1, col2 = st.columns(2)
+            with col1:
+                if st.button("Save", key=f"save_{comment_id}"):
+                    store.edit(comment_id, new_name, new_text)
+                    st.session_state.edit_id = None
+                    st.success("Comment updated!")
+                    st.rerun()
+            with col2:
+                if st.button("Cancel", key=f"cancel_{comment_id}"):
+                    st.session_state.edit_id = None
+                    st.rerun()
+        else:
+            # Comments are shared between visitors, so never render them as raw HTML.
+            pending = " <i>(posting…)</i>" if c.get("pending") else ""
+            st.markdown(f"<div class='comment-meta'><b>{html.escape(c['name'])}</b>{pending}</div>", unsafe_allow_html=True)
+            st.markdown(f"<div>{html.escape(c['text'])}</div>", unsafe_allow_html=True)
+            cols = st.columns([0.1, 0.9])
+            with cols[0]:
+                if comment_id in st.session_state.my_comments and st.button("✏️", key=f"edit_btn_{comment_id}"):
+                    st.session_state.edit_id = comment_id
+                    st.rerun()
+            with cols[1]:
+                st.code(c["text"], language="")
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    if cursor is not None and st.button("Load more comments"):
+        st.session_state.comment_pages += 1
+        st.rerun()
+
+    st.markdown("---")
+    st.markdown("🙏 *Thank you for helping us grow and improve this ministry.*")
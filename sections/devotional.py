@@ -0,0 +1,30 @@
+import streamlit as st
+
+from feeds import FeedCache, DEVOTIONAL_FEED
+
+
+# --- Data Loaders ---
+@st.cache_resource
+def get_feed_cache():
+    return FeedCache([DEVOTIONAL_FEED]).start()
+
+
+# --- Daily Devotional ---
+def render():
+    st.header("Daily Devotional (Our Daily Bread)")
+
+    devotionals = get_feed_cache().entries(DEVOTIONAL_FEED, limit=3)  # Show the latest 3 devotionals
+
+    if devotionals:
+        for entry in devotionals:
+            st.subheader(entry["title"])
+            st.markdown(f"_{entry['published']}_")
+            st.markdown(entry["html"], unsafe_allow_html=True)  # sanitized when fetched
+            st.markdown(f"[Read more]({entry['link']})")
+            st.markdown("---")
+    else:
+        st.info("Unable to fetch devotionals. Please try again later.")
+
+    # --- Add the latest Our Daily Bread video ---
+    st.subheader("Watch Today's Devotional")
+    st.video("https://www.youtube.com/watch?v=Qw3R8b6qQ1A")  # Replace with the latest video URL if needed
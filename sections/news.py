@@ -0,0 +1,39 @@
+import html
+
+import streamlit as st
+
+from feeds import FeedCache, NEWS_FEEDS
+
+
+# --- Data Loaders ---
+@st.cache_resource
+def get_feed_cache():
+    return FeedCache(NEWS_FEEDS).start()
+
+
+# --- Bible News with Embedded Images ---
+def render():
+    st.subheader("📰 Global Bible News & Updates")
+    feed_cache = get_feed_cache()
+
+    # Entries arrive already parsed: image URL and excerpt were extracted
+    # once when the feed was fetched.
+    for url in NEWS_FEEDS:
+        items = feed_cache.entries(url, limit=3)
+        for item in items:
+            # --- News Card ---
+            st.markdown("""
+            <div style='padding:1em; margin-bottom:1.5em; background-color:#fff; border:1px solid #eee; border-radius:10px; box-shadow:0 2px 6px rgba(0,0,0,0.05);'>
+            """, unsafe_allow_html=True)
+
+            if item["image"]:
+                st.image(item["image"], use_container_width=True)
+
+            st.markdown(f"**{html.escape(item['title'])}**", unsafe_allow_html=True)
+            st.markdown(item["excerpt"])
+            st.markdown(f"<a href='{html.escape(item['link'])}' target='_blank'>Read more →</a>", unsafe_allow_html=True)
+            st.markdown("</div>", unsafe_allow_html=True)
+
+    st.markdown("---")
+    st.markdown("🙏 *Let every headline remind us to pray and act with hope.*")
+    st.link_button("Give with Grace", url="https://buy.stripe.com/28EfZg6hD1Lk0zsg7pdZ602")
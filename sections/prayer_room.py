@@ -0,0 +1,72 @@
+import time
+
+import streamlit as st
+
+from audio_service import audio_url, prepare_audio
+from prayer_timer import prayer_timer
+
+
+# --- Data Loaders ---
+@st.cache_resource
+def get_audio_tracks():
+    return prepare_audio()
+
+
+def play_track(track, low_bitrate=False):
+    # Hand the browser a URL so it streams (and seeks) straight from disk;
+    # fall back to sending the file itself if no URL can be built.
+    url = audio_url(track, st.context.url, low_bitrate)
+    st.audio(url or track["file"], format="audio/mp3")
+
+
+# --- Prayer Room ---
+def render():
+    # st.image("prayer.png", use_container_width=True)  # <-- Remove or comment out this line
+    st.header("🙏 Prayer Room")
+
+    tracks = get_audio_tracks()
+    music = [name for name in tracks if name != "The Lord's Prayer"]
+    sound_choice = None
+    if music:
+        # Worship Music is default when its file is present
+        sound_choice = st.selectbox("🔔 Choose Prayer Music", music, index=min(1, len(music) - 1))
+
+    duration_minutes = st.slider("Set Prayer Time (minutes)", 1, 60, 5)
+    duration_seconds = duration_minutes * 60
+
+    # Smaller mono versions for slow or metered connections (when ffmpeg built them)
+    data_saver = st.checkbox("Data saver (lower-quality audio)", value=False)
+
+    # Option to play music during prayer
+    play_music = st.checkbox("Play music while praying", value=False)
+
+    # Show music player for manual play before countdown
+    if play_music and sound_choice:
+        play_track(tracks[sound_choice], data_saver)
+        st.info("Click the play button above to start your prayer music.")
+
+    # Option to play Lord's Prayer during prayer
+    play_lords_prayer = st.checkbox("Play Lord's Prayer while praying", value=False)
+
+    # Show Lord's Prayer audio player for manual play before countdown
+    if play_lords_prayer and "The Lord's Prayer" in tracks:
+        play_track(tracks["The Lord's Prayer"], data_saver)
+        st.info("Click the play button above to listen to the Lord's Prayer during your prayer.")
+
+    gentle_message = (
+        "<b>🔥 Come As You Are </b><br>"
+        "Why set a timer to meet God? Because stillness rarely finds us on its own—we must choose it. In these few minutes, time won’t race past. It will settle. It will breathe.<br>"
+        "Don’t ask. Just be. Let your heart rest in His presence.<br>"
+        "It doesn’t matter what burdens you carry or what mistakes you made today—come as you are. God already knows. What He desires most is your presence."
+    )
+
+    # The countdown runs in the browser; the server only stores the end time
+    # (so it survives reruns) and hears back once when it finishes.
+    if st.button("Start Countdown"):
+        st.session_state.prayer_end = time.time() + duration_seconds
+
+    if st.session_state.get("prayer_end"):
+        finished = prayer_timer(st.session_state.prayer_end, gentle_message, key="prayer_timer")
+        if st.button("Close" if finished else "End prayer time"):
+            st.session_state.prayer_end = None
+            st.rerun()
@@ -0,0 +1,53 @@
+import streamlit as st
+
+from bible_books import BOOKS, BOOK_CHAPTERS
+from bible_corpus import load_corpus
+from chapter_cache import ChapterCache
+
+
+# --- Data Loaders ---
+@st.cache_resource
+def get_chapter_cache():
+    return ChapterCache()
+
+@st.cache_resource
+def get_corpus():
+    return load_corpus()
+
+
+# --- Bible Reading Room ---
+def render():
+    st.subheader("📖 Bible Reading Room")
+    st.markdown("""
+    <div class='donation-cta'>
+    A quiet place to linger with Scripture — read, reflect, and let the Word dwell richly.
+    </div>
+    """, unsafe_allow_html=True)
+
+    # --- Select Book and Chapter ---
+    book = st.selectbox("Choose a Book", BOOKS)
+    chapter = st.number_input("Choose Chapter", min_value=1, max_value=BOOK_CHAPTERS[book], value=1)
+
+    # --- Display Selected Book and Chapter ---
+    st.markdown(f"### {book} {int(chapter)}")
+
+    # Read from the local corpus when imported, else the cached Bible API
+    corpus = get_corpus()
+    verses = corpus.get_chapter(book, int(chapter)) if corpus else []
+    if not verses:
+        cache = get_chapter_cache()
+        data = cache.get(book, int(chapter))
+        verses = data.get("verses", []) if data else []
+        # Readers mostly turn the page: warm the chapters either side
+        cache.prefetch(book, int(chapter), BOOK_CHAPTERS[book])
+    if verses:
+        all_verses = "<br>".join(
+            f"<b>{verse['verse']}.</b> {verse['text']}" for verse in verses
+        )
+        st.markdown(
+            f"<div class='verse-box'>{all_verses}</div>",
+            unsafe_allow_html=True
+        )
+        st.success("All verses displayed.")
+    else:
+        st.info("Unable to fetch Bible text. Please check your internet connection or try another book/chapter.")
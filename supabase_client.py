@@ -1,7 +1,32 @@
-from supabase import create_client
 import os
+import threading
 
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
+_client = None
+_lock = threading.Lock()
 
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+
+def supabase_configured():
+    return bool(os.getenv("SUPABASE_URL") and os.getenv("SUPABASE_KEY"))
+
+
+def get_supabase():
+    """Return the shared Supabase client, created on first use.
+
+    Returns None when SUPABASE_URL/SUPABASE_KEY aren't set, so importing this
+    module never fails or does any setup work. The client keeps its HTTP
+    connections open, so every caller reuses the same pool.
+    """
+    global _client
+    if _client is None and supabase_configured():
+        with _lock:
+            if _client is None:
+                from supabase import create_client
+                _client = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY"))
+    return _client
+
+
+def __getattr__(name):
+    # Keeps `from supabase_client import supabase` working, lazily.
+    if name == "supabase":
+        return get_supabase()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
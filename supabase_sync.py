@@ -0,0 +1,131 @@
+"""Background push of local tokens.db tables to Supabase.
+
+The app only ever writes SQLite; this worker copies new chat_history rows
+(tracked by a last-synced id) and changed user_tokens rows (diffed against a
+local snapshot of what was last pushed) to Supabase in batched upserts,
+retrying with exponential backoff. A Supabase outage only delays the copy.
+"""
+import logging
+import random
+import threading
+import time
+
+import db
+from supabase_client import get_supabase
+
+logger = logging.getLogger(__name__)
+
+TOKEN_COLUMNS = ("user_id", "tokens_left", "last_reset", "is_paid")
+
+
+class SyncWorker:
+    def __init__(self, path=db.DB_PATH, client_factory=get_supabase, interval=30, batch_size=500,
+                 max_retries=5, base_delay=0.5):
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self._client_factory = client_factory
+        self._conn = db.connect(path)  # used only by the worker thread
+        db.migrate(self._conn)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS supabase_sync_state (
+                table_name TEXT PRIMARY KEY,
+                last_id INTEGER NOT NULL
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS supabase_synced_tokens (
+                user_id TEXT PRIMARY KEY,
+                tokens_left INTEGER,
+                last_reset TEXT,
+                is_paid INTEGER
+            )
+        """)
+        self._conn.commit()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if not self._thread:
+            self._thread = threading.Thread(target=self._run, name="supabase-sync", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def wake(self):
+        """Ask for a sync now instead of at the next interval."""
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.sync_once()
+            except Exception:
+                logger.exception("Supabase sync failed; will retry next interval")
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def sync_once(self):
+        """Push everything pending. Returns the number of rows pushed."""
+        client = self._client_factory()
+        if client is None:
+            return 0
+        return self._sync_chat_history(client) + self._sync_user_tokens(client)
+
+    def _sync_chat_history(self, client):
+        pushed = 0
+        if not self._conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'chat_history'").fetchone():
+            return pushed  # HistoryStore hasn't created it yet
+        while True:
+            row = self._conn.execute(
+                "SELECT last_id FROM supabase_sync_state WHERE table_name = 'chat_history'"
+            ).fetchone()
+            last_id = row[0] if row else 0
+            rows = self._conn.execute(
+                "SELECT id, user_id, role, message, timestamp FROM chat_history WHERE id > ? ORDER BY id LIMIT ?",
+                (last_id, self.batch_size),
+            ).fetchall()
+            if not rows:
+                return pushed
+            records = [dict(zip(("id", "user_id", "role", "message", "timestamp"), r)) for r in rows]
+            self._upsert(client, "chat_history", records, "id")
+            self._conn.execute(
+                "INSERT OR REPLACE INTO supabase_sync_state (table_name, last_id) VALUES ('chat_history', ?)",
+                (rows[-1][0],),
+            )
+            self._conn.commit()
+            pushed += len(rows)
+
+    def _sync_user_tokens(self, client):
+        pushed = 0
+        columns = ", ".join(TOKEN_COLUMNS)
+        while True:
+            rows = self._conn.execute(
+                f"SELECT {columns} FROM user_tokens EXCEPT SELECT {columns} FROM supabase_synced_tokens LIMIT ?",
+                (self.batch_size,),
+            ).fetchall()
+            if not rows:
+                return pushed
+            self._upsert(client, "user_tokens", [dict(zip(TOKEN_COLUMNS, r)) for r in rows], "user_id")
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO supabase_synced_tokens ({columns}) VALUES (?, ?, ?, ?)", rows
+            )
+            self._conn.commit()
+            pushed += len(rows)
+
+    def _upsert(self, client, table, records, conflict_column):
+        for attempt in range(self.max_retries + 1):
+            try:
+                client.table(table).upsert(records, on_conflict=conflict_column).execute()
+                return
+            except Exception as e:
+                if attempt == self.max_retries or self._stop.is_set():
+                    raise
+                delay = self.base_delay * 2 ** attempt * random.uniform(0.5, 1.5)
+                logger.warning("Upsert of %d %s rows failed (%s); retrying in %.1fs", len(records), table, e, delay)
+                time.sleep(delay)
@@ -1,12 +1,20 @@
 import streamlit as st
 import os
+import uuid
 from openai import OpenAI
 from dotenv import load_dotenv
-import streamlit.components.v1 as components
+from chat_stream import render_stream
+from openai_scheduler import get_scheduler
+from token_meter import TokenMeter
+from transcript import Transcript, render_transcript
 
 # Load .env variables
 load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)  # the scheduler retries
+
+@st.cache_resource
+def get_token_meter():
+    return TokenMeter()
 
 st.set_page_config(page_title="NM2 Bible Chat", layout="centered")
 
@@ -14,73 +22,39 @@ st.title("NM2 Bible Chat")
 
 if "messages" not in st.session_state:
     st.session_state.messages = []
+if "user_id" not in st.session_state:
+    st.session_state.user_id = uuid.uuid4().hex
+if "transcript" not in st.session_state:
+    st.session_state.transcript = Transcript()
 
 # Chat Display Box
-chat_html = """
-<style>
-#chat-box {
-    display: flex;
-    flex-direction: column;
-    max-height: 400px;
-    overflow-y: auto;
-    margin: 1rem 0;
-    padding: 1rem;
-    background: #fff;
-    border-radius: 10px;
-    box-shadow: 0 2px 6px rgba(0,0,0,0.05);
-}
-.chat-message {
-    margin: 0.5rem 0;
-    padding: 0.75rem 1rem;
-    border-radius: 12px;
-    max-width: 80%;
-    word-wrap: break-word;
-}
-.user {
-    background-color: #e1f5fe;
-    align-self: flex-end;
-}
-.assistant {
-    background-color: #ede7f6;
-    align-self: flex-start;
-}
-</style>
-<div id="chat-box">
-"""
-
-for msg in st.session_state.messages:
-    role = "user" if msg["role"] == "user" else "assistant"
-    chat_html += f"<div class='chat-message {role}'>{msg['content']}</div>"
-
-chat_html += """
-</div>
-<script>
-setTimeout(() => {
-    const chatBox = window.parent.document.querySelector("#chat-box");
-    if (chatBox) chatBox.scrollTop = chatBox.scrollHeight;
-}, 100);
-</script>
-"""
-
-components.html(chat_html, height=400)
+# Messages are escaped once when added; only the newest window is drawn.
+if st.session_state.transcript.hidden and st.button("Show earlier messages"):
+    st.session_state.transcript.show_more()
+view = st.empty()
+render_transcript(st.session_state.transcript, view)
 
 # Input
 prompt = st.chat_input("What’s on your heart today?")
-if prompt:
+if prompt and not get_token_meter().consume(st.session_state.user_id):
+    st.warning("You've used today's free messages. Please come back tomorrow.")
+elif prompt:
     st.session_state.messages.append({"role": "user", "content": prompt})
+    st.session_state.transcript.append("user", prompt)
+    render_transcript(st.session_state.transcript, view)
+
+    history = [{"role": m["role"], "content": m["content"]} for m in st.session_state.messages]
 
-    with st.spinner("💬 Thinking..."):
-        try:
-            response = client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": m["role"], "content": m["content"]}
-                    for m in st.session_state.messages
-                ],
-                temperature=0.7,
-            )
-            assistant_text = response.choices[0].message.content
-        except Exception as e:
-            assistant_text = "⚠️ Something went wrong: " + str(e)
+    placeholder = st.empty()
+    placeholder.markdown("💬 Thinking...")
+    assistant_text, error = render_stream(
+        get_scheduler().stream_chat(client, history, user_id=st.session_state.user_id), placeholder
+    )
+    if error:
+        if not assistant_text:
+            get_token_meter().refund(st.session_state.user_id)
+        assistant_text = (assistant_text + "\n\n" if assistant_text else "") + "⚠️ Something went wrong: " + str(error)
 
     st.session_state.messages.append({"role": "assistant", "content": assistant_text})
+    st.session_state.transcript.append("assistant", assistant_text)
+    st.rerun()
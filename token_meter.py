@@ -0,0 +1,204 @@
+"""Per-user chat token metering kept in memory and flushed to tokens.db.
+
+consume() decrements an in-memory balance under a lock, so a chat turn never
+opens a write transaction. A flusher thread periodically writes the spend of
+every touched user in one transaction, as deltas (tokens_left = tokens_left -
+spent) rather than absolute values, so credits the webhook adds in the
+meantime are never overwritten; balances are then re-read from the database.
+
+The daily free allowance is applied lazily: the first consume() on a new day
+tops the balance up to DAILY_FREE_TOKENS (paid balances above it are kept),
+and the flush applies the same top-up in SQL guarded by last_reset, so it
+happens once per user per day however many processes run.
+
+tokens.db stays the source of truth. A failed flush keeps its deltas for the
+next attempt; a hard crash loses at most `flush_interval` of spend and never
+double-counts, and buckets are rebuilt from the table on restart.
+"""
+import atexit
+import logging
+import os
+import threading
+from datetime import datetime
+
+import db
+
+logger = logging.getLogger(__name__)
+
+DAILY_FREE_TOKENS = int(os.getenv("DAILY_FREE_TOKENS", "10"))
+
+
+def _today():
+    return datetime.now().date().isoformat()
+
+
+class _Bucket:
+    __slots__ = ("balance", "day", "spent", "spent_before_reset", "reset_day")
+
+    def __init__(self, balance, day):
+        self.balance = balance
+        self.day = day
+        self.spent = 0               # since the last flush (after any pending reset)
+        self.spent_before_reset = 0  # spent on an earlier day, not yet flushed
+        self.reset_day = None        # daily top-up not yet flushed
+
+
+class TokenMeter:
+    def __init__(self, path=db.DB_PATH, daily_free=DAILY_FREE_TOKENS, flush_interval=2.0):
+        self.daily_free = daily_free
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._buckets = {}
+        self._dirty = set()
+        self._conn = db.connect(path)  # guarded by _flush_lock
+        db.migrate(self._conn)
+        self._read_lock = threading.Lock()
+        self._reader = db.connect(path)  # WAL lets bucket loads run during a flush
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="token-meter", daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def consume(self, user_id, cost=1):
+        """Spend `cost` tokens if the user has them; returns True on success.
+
+        When the in-memory balance is short, it is refreshed from tokens.db
+        once before refusing, to pick up credits bought since it was loaded.
+        """
+        bucket = self._bucket(user_id)
+        for attempt in range(2):
+            with self._lock:
+                self._roll_day(bucket)
+                if bucket.balance >= cost:
+                    bucket.balance -= cost
+                    bucket.spent += cost
+                    self._dirty.add(user_id)
+                    return True
+                self._dirty.add(user_id)  # makes the flush re-read this user
+            if attempt == 0:
+                self.flush()
+        return False
+
+    def refund(self, user_id, cost=1):
+        """Give back tokens for a call that produced nothing."""
+        bucket = self._bucket(user_id)
+        with self._lock:
+            self._roll_day(bucket)  # a refund after midnight belongs to today's counters
+            bucket.balance += cost
+            bucket.spent -= cost
+            self._dirty.add(user_id)
+
+    def balance(self, user_id):
+        bucket = self._bucket(user_id)
+        with self._lock:
+            self._roll_day(bucket)
+            return bucket.balance
+
+    def flush(self):
+        """Write pending spend to tokens.db and refresh balances from it."""
+        with self._flush_lock:
+            with self._lock:
+                pending = {}
+                for user_id in self._dirty:
+                    bucket = self._buckets[user_id]
+                    pending[user_id] = (bucket.spent_before_reset, bucket.reset_day, bucket.spent)
+                    bucket.spent_before_reset, bucket.reset_day, bucket.spent = 0, None, 0
+                self._dirty.clear()
+            if not pending:
+                return
+            try:
+                rows = self._write(pending)
+            except Exception:
+                self._conn.rollback()
+                with self._lock:
+                    for user_id, snapshot in pending.items():
+                        self._restore(self._buckets[user_id], snapshot)
+                        self._dirty.add(user_id)
+                logger.exception("Could not flush token usage for %d users", len(pending))
+                return
+            with self._lock:
+                for user_id, tokens_left, last_reset in rows:
+                    bucket = self._buckets[user_id]
+                    # Reapply whatever was spent while the flush ran.
+                    if bucket.reset_day:
+                        tokens_left = max(tokens_left - bucket.spent_before_reset, self.daily_free)
+                    bucket.balance = tokens_left - bucket.spent
+                    bucket.day = bucket.reset_day or last_reset
+
+    def stop(self):
+        self._stop.set()
+        self.flush()
+
+    def _bucket(self, user_id):
+        bucket = self._buckets.get(user_id)
+        if bucket is None:
+            with self._read_lock:
+                row = self._reader.execute(
+                    "SELECT tokens_left, last_reset FROM user_tokens WHERE user_id = ?", (user_id,)
+                ).fetchone()
+            with self._lock:
+                bucket = self._buckets.get(user_id)
+                if bucket is None:
+                    if row:
+                        bucket = _Bucket(row[0] or 0, row[1])
+                    else:
+                        bucket = _Bucket(self.daily_free, _today())
+                        self._dirty.add(user_id)  # the flush creates the row
+                    self._buckets[user_id] = bucket
+        return bucket
+
+    def _roll_day(self, bucket):
+        today = _today()
+        if bucket.day != today:
+            bucket.balance = max(bucket.balance, self.daily_free)
+            bucket.spent_before_reset += bucket.spent
+            bucket.spent = 0
+            bucket.reset_day = bucket.day = today
+
+    def _restore(self, bucket, snapshot):
+        # Put a failed flush's deltas back in front of anything spent since.
+        before, reset_day, spent = snapshot
+        if bucket.reset_day:
+            bucket.spent_before_reset += before + spent
+        elif reset_day:
+            bucket.spent_before_reset, bucket.reset_day = before, reset_day
+            bucket.spent += spent
+        else:
+            bucket.spent += spent
+
+    def _write(self, pending):
+        today = _today()
+        conn = self._conn
+        conn.executemany(
+            "INSERT OR IGNORE INTO user_tokens (user_id, tokens_left, last_reset) VALUES (?, ?, ?)",
+            [(user_id, self.daily_free, today) for user_id in pending],
+        )
+        conn.executemany(
+            "UPDATE user_tokens SET tokens_left = tokens_left - ? WHERE user_id = ?",
+            [(before, user_id) for user_id, (before, _, _) in pending.items() if before],
+        )
+        conn.executemany(
+            """UPDATE user_tokens SET tokens_left = MAX(COALESCE(tokens_left, 0), ?), last_reset = ?
+               WHERE user_id = ? AND (last_reset IS NULL OR last_reset < ?)""",
+            [(self.daily_free, day, user_id, day) for user_id, (_, day, _) in pending.items() if day],
+        )
+        conn.executemany(
+            "UPDATE user_tokens SET tokens_left = tokens_left - ? WHERE user_id = ?",
+            [(spent, user_id) for user_id, (_, _, spent) in pending.items() if spent],
+        )
+        conn.commit()
+        users = list(pending)
+        rows = []
+        for i in range(0, len(users), 500):
+            chunk = users[i:i + 500]
+            rows += conn.execute(
+                "SELECT user_id, tokens_left, last_reset FROM user_tokens "
+                f"WHERE user_id IN ({', '.join('?' * len(chunk))})",
+                chunk,
+            ).fetchall()
+        return rows
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
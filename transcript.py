@@ -0,0 +1,111 @@
+"""Chat transcript kept in session state and rendered a window at a time.
+
+Each message is converted once, when it is added, and kept next to its
+text: user messages as escaped text, assistant messages as markdown (with
+raw HTML escaped), the same way render_stream drew them while they
+streamed, so an answer keeps its formatting once it lands. A rerun draws
+only the newest `window` messages as a single markdown element (not one
+component per message), and older ones are drawn only after "Show earlier
+messages" asks for them. The joined HTML is cached and extended as the
+window slides: appending a message adds its HTML and drops the one that
+scrolled out, instead of rejoining the whole window.
+
+A message may carry (label, verse text) references, drawn under it as
+collapsed <details> so the scripture an answer cites opens in place.
+"""
+import html
+
+import streamlit as st
+
+TRANSCRIPT_CSS = """
+<style>
+.transcript { display: flex; flex-direction: column; margin: 1rem 0; }
+.transcript .chat-message {
+    margin: 0.4rem 0;
+    padding: 0.75rem 1rem;
+    border-radius: 12px;
+    max-width: 80%;
+    word-wrap: break-word;
+    box-shadow: 0 2px 6px rgba(0,0,0,0.04);
+}
+.transcript .user { background-color: #e1f5fe; align-self: flex-end; }
+.transcript .assistant { background-color: #ede7f6; align-self: flex-start; }
+.transcript details { margin-top: 0.4rem; font-size: 0.9em; }
+.transcript summary { cursor: pointer; font-weight: 600; }
+</style>
+"""
+
+
+def _markdown(text):
+    """Markdown source that can sit inside the transcript's HTML block."""
+    text = text.replace("&", "&amp;").replace("<", "&lt;")
+    if sum(line.lstrip().startswith("```") for line in text.splitlines()) % 2:
+        text += "\n```"  # an unclosed fence would swallow the messages after it
+    # Blank lines around it end the enclosing HTML block, so it is parsed as markdown.
+    return f"\n\n{text}\n\n"
+
+
+def message_html(role, content, references=()):
+    if role == "user":
+        body = html.escape(content).replace("\n", "<br>")
+    else:
+        role = "assistant"
+        body = _markdown(content)
+    body += "".join(
+        f"<details><summary>{html.escape(label)}</summary>{html.escape(text)}</details>"
+        for label, text in references
+    )
+    return f"<div class='chat-message {role}'>{body}</div>"
+
+
+def _entry(role, content, references=()):
+    return {"role": role, "content": content, "html": message_html(role, content, references)}
+
+
+class Transcript:
+    def __init__(self, window=20):
+        self.window = window
+        self.shown = window
+        self._messages = []  # {"role", "content", "html"}
+        self._cache = None   # (start, end, joined html of messages[start:end])
+
+    def __len__(self):
+        return len(self._messages)
+
+    def append(self, role, content, references=()):
+        self._messages.append(_entry(role, content, references))
+
+    def extend(self, messages):
+        for m in messages:
+            self.append(m["role"], m["content"], m.get("references", ()))
+
+    def prepend(self, messages):
+        """Add older messages (oldest first) in front, e.g. a page from history."""
+        self._messages[:0] = [_entry(m["role"], m["content"], m.get("references", ())) for m in messages]
+        self.shown += len(messages)
+        self._cache = None
+
+    @property
+    def hidden(self):
+        return max(len(self._messages) - self.shown, 0)
+
+    def show_more(self):
+        self.shown += self.window
+
+    def html(self):
+        start, end = self.hidden, len(self._messages)
+        if not self._cache or start < self._cache[0]:
+            body = "".join(m["html"] for m in self._messages[start:end])
+        else:
+            cached_start, cached_end, body = self._cache
+            if (cached_start, cached_end) != (start, end):
+                dropped = sum(len(m["html"]) for m in self._messages[cached_start:start])
+                body = body[dropped:] + "".join(m["html"] for m in self._messages[cached_end:end])
+        self._cache = (start, end, body)
+        return f"<div class='transcript'>{body}</div>"
+
+
+def render_transcript(transcript, placeholder=None):
+    """Draw the visible window into `placeholder` (an st.empty()) or the page."""
+    target = placeholder or st
+    target.markdown(TRANSCRIPT_CSS + transcript.html(), unsafe_allow_html=True)
@@ -0,0 +1,210 @@
+"""Verse of the day, generated offline and looked up by date.
+
+A batch run asks OpenAI for one verse and a short teaching per calendar day
+(366 of them, so February 29 has its own), appending each to a JSONL work
+file so an interrupted run resumes where it stopped:
+
+    python verse_of_day.py generate --workers 4
+
+Verse text is taken from the local corpus when it has been imported (see
+bible_corpus.py), so only the choice and the teaching come from the model.
+The work file is then packed into one compact file:
+
+    magic | day count | string offsets | UTF-8 text
+
+The app loads it once per process; today's entry is two array reads and a
+slice, the same all day. Days without an entry (or no file at all) fall back
+to a small built-in list, chosen by date rather than at random.
+"""
+import argparse
+import json
+import os
+import struct
+import threading
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+from bible_books import canonical_book
+from bible_corpus import load_corpus
+from jsonl_resume import compact_jsonl, read_jsonl
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+VERSES_PATH = os.path.join(BASE_DIR, "verse_of_day.bin")
+WORK_PATH = os.path.join(BASE_DIR, "verse_of_day.jsonl")
+
+MAGIC = b"NM2VOTD1"
+HEADER = struct.Struct("<8sI")  # magic, days
+DAYS = 366
+
+FALLBACK_VERSES = [
+    {
+        "verse": "“Trust in the Lord with all your heart and lean not on your own understanding.” — Proverbs 3:5",
+        "teaching": "Divine wisdom runs deeper than logic. Trust requires surrender — not silence, but strength."
+    },
+    {
+        "verse": "“The Lord is my shepherd; I shall not want.” — Psalm 23:1",
+        "teaching": "God’s care is constant. His presence provides even when provision seems absent."
+    },
+    {
+        "verse": "“Let the peace of Christ rule in your hearts.” — Colossians 3:15",
+        "teaching": "Peace isn't passive — it's the holy authority of calm amidst chaos."
+    }
+]
+
+THEMES = [
+    "trust", "hope", "peace", "forgiveness", "courage", "gratitude", "patience", "love",
+    "faithfulness", "rest", "joy", "humility", "wisdom", "prayer", "mercy", "provision",
+    "comfort in grief", "new beginnings", "perseverance", "generosity", "God's presence",
+    "grace", "healing", "obedience", "fear and anxiety", "community", "purpose", "praise",
+]
+
+PROMPT = (
+    "Choose one Bible verse for {day} on the theme of {theme}. Reply with JSON: "
+    '{{"book": ..., "chapter": ..., "verse": ..., "text": "the verse text", '
+    '"teaching": "two or three warm, reflective sentences applying the verse to daily life"}}'
+)
+
+
+def day_index(day):
+    """0-based slot for a date; leap-year numbering keeps each month/day fixed."""
+    return date(2024, day.month, day.day).timetuple().tm_yday - 1
+
+
+def _day_name(index):
+    day = date.fromordinal(date(2024, 1, 1).toordinal() + index)
+    return f"{day:%B} {day.day}"
+
+
+class VersesOfDay:
+    def __init__(self, path=VERSES_PATH):
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, days = HEADER.unpack_from(data, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a verse-of-the-day file")
+        pos = HEADER.size
+        self._offsets = array("I")
+        self._offsets.frombytes(data[pos:pos + 4 * (2 * days + 1)])
+        self._text = data[pos + 4 * (2 * days + 1):]
+        self.days = days
+
+    def _string(self, i):
+        return self._text[self._offsets[i]:self._offsets[i + 1]].decode("utf-8")
+
+    def get(self, day):
+        """{"verse", "teaching"} for a date, or None if that day has no entry."""
+        i = day_index(day)
+        verse = self._string(2 * i)
+        return {"verse": verse, "teaching": self._string(2 * i + 1)} if verse else None
+
+
+def load_verses(path=VERSES_PATH):
+    """Open the generated file, or return None if it hasn't been built."""
+    if not os.path.exists(path):
+        return None
+    return VersesOfDay(path)
+
+
+def verse_for(day, verses=None):
+    """The verse for `day`: generated when available, else a fallback that is stable for the day."""
+    entry = verses.get(day) if verses else None
+    return entry or FALLBACK_VERSES[day.toordinal() % len(FALLBACK_VERSES)]
+
+
+# --- Batch pipeline ---
+def _generate_day(index, client, scheduler, corpus, model):
+    prompt = PROMPT.format(day=_day_name(index), theme=THEMES[index % len(THEMES)])
+    completion = scheduler.call("verse-of-day", lambda: client.chat.completions.create(
+        model=model,
+        messages=[{"role": "user", "content": prompt}],
+        response_format={"type": "json_object"},
+        temperature=0.7,
+    ))
+    answer = json.loads(completion.choices[0].message.content)
+    book = canonical_book(str(answer["book"])) or str(answer["book"])
+    chapter, verse = int(answer["chapter"]), int(answer["verse"])
+    text = (corpus.get_verse(book, chapter, verse) if corpus else None) or answer["text"]
+    text = text.strip().strip('"“”')
+    return {
+        "day": index,
+        "reference": f"{book} {chapter}:{verse}",
+        "verse": f"“{text}” — {book} {chapter}:{verse}",
+        "teaching": answer["teaching"].strip(),
+    }
+
+
+def completed_days(work_path=WORK_PATH):
+    return {entry["day"]: entry for entry in read_jsonl(work_path)}
+
+
+def generate(work_path=WORK_PATH, workers=4, model="gpt-3.5-turbo"):
+    """Fill in every missing day; returns (generated, failed)."""
+    from openai import OpenAI
+
+    from openai_scheduler import OpenAIScheduler
+
+    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)
+    scheduler = OpenAIScheduler(max_concurrency=workers)
+    corpus = load_corpus()
+    done = compact_jsonl(work_path, key=lambda entry: entry["day"])
+    missing = [i for i in range(DAYS) if i not in done]
+    lock = threading.Lock()
+    counts = {"generated": 0, "failed": 0}
+
+    def run(index):
+        try:
+            entry = _generate_day(index, client, scheduler, corpus, model)
+        except Exception as e:
+            print(f"⚠️ {_day_name(index)}: {e}")
+            with lock:
+                counts["failed"] += 1
+            return
+        with lock:
+            with open(work_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            counts["generated"] += 1
+        print(f"✅ {_day_name(index)}: {entry['reference']}")
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(run, missing))
+    return counts["generated"], counts["failed"]
+
+
+def build(work_path=WORK_PATH, dest=VERSES_PATH):
+    """Pack the work file into the lookup file. Returns the number of days filled."""
+    done = completed_days(work_path)
+    offsets, blob = array("I", [0]), bytearray()
+    for index in range(DAYS):
+        entry = done.get(index, {})
+        for field in ("verse", "teaching"):
+            blob += entry.get(field, "").encode("utf-8")
+            offsets.append(len(blob))
+    tmp = dest + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, DAYS))
+        f.write(offsets.tobytes())
+        f.write(blob)
+    os.replace(tmp, dest)
+    return len(done)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate and pack the verse of the day.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    gen = sub.add_parser("generate", help="generate missing days, then build")
+    gen.add_argument("--workers", type=int, default=4)
+    gen.add_argument("--model", default="gpt-3.5-turbo")
+    sub.add_parser("build", help="pack the work file into the lookup file")
+    show = sub.add_parser("show", help="print the verse for a date")
+    show.add_argument("date", nargs="?", default=date.today().isoformat())
+    args = parser.parse_args()
+
+    if args.command == "generate":
+        generated, failed = generate(workers=args.workers, model=args.model)
+        print(f"\n📖 {generated} generated, {failed} failed (rerun to retry)")
+    if args.command in ("generate", "build"):
+        print(f"✅ Packed {build()} of {DAYS} days into {VERSES_PATH}")
+    else:
+        entry = verse_for(date.fromisoformat(args.date), load_verses())
+        print(f"{entry['verse']}\n\n{entry['teaching']}")
@@ -1,51 +1,181 @@
+import atexit
+import json
+import logging
 import os
-import sqlite3
+import queue
+import threading
+import time
 import stripe
 from flask import Flask, request
 from dotenv import load_dotenv
 from datetime import datetime
 
+import db
+from metrics import PROMETHEUS_CONTENT_TYPE, render_prometheus, span
+
 # Load keys
 load_dotenv()
 stripe.api_key = os.getenv("STRIPE_SECRET_KEY")
 endpoint_secret = os.getenv("STRIPE_WEBHOOK_SECRET")
 
+logger = logging.getLogger(__name__)
+
+TOKEN_MAP = {
+    "supporter": 10,
+    "sustainer": 25,
+    "patron": 50
+}
+
+
+class CreditWorker:
+    """Applies token credits from the pending_credits table in batched transactions.
+
+    submit() commits the event to pending_credits before the webhook answers,
+    so an acknowledged purchase survives a crash or a failed credit. The worker
+    thread credits each event in its own savepoint: the event id goes into
+    processed_events with the credit (so Stripe's retries never credit twice)
+    and the pending row is deleted. An event that fails stays pending and is
+    retried with exponential backoff without holding up the rest of its batch.
+    """
+
+    def __init__(self, path=db.DB_PATH, batch_size=100, flush_interval=0.2,
+                 retry_interval=30.0, base_delay=1.0, max_delay=3600.0):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retry_interval = retry_interval
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._wake = queue.Queue()
+        self._intake = db.connect(path)  # shared by request threads, under _intake_lock
+        self._intake_lock = threading.Lock()
+        self._conn = db.connect(path)  # owned by the worker thread
+        db.migrate(self._conn)
+        self._thread = threading.Thread(target=self._run, name="credit-worker", daemon=True)
+        self._thread.start()
+        self._wake.put(None)  # pick up anything left pending by the last run
+        atexit.register(self.flush)
+
+    def submit(self, event_id, user_id, tokens):
+        """Durably record a credit; raises if it could not be stored."""
+        with self._intake_lock:
+            try:
+                self._intake.execute(
+                    "INSERT OR IGNORE INTO pending_credits (event_id, user_id, tokens) VALUES (?, ?, ?)",
+                    (event_id, user_id, tokens),
+                )
+                self._intake.commit()
+            except Exception:
+                self._intake.rollback()
+                raise
+        self._wake.put(event_id)
+
+    def flush(self):
+        """Block until every submitted credit has been attempted at least once."""
+        self._wake.join()
+
+    def _run(self):
+        while True:
+            try:
+                woken = [self._wake.get(timeout=self.retry_interval)]
+            except queue.Empty:
+                woken = []  # time to retry anything that failed earlier
+            deadline = time.monotonic() + self.flush_interval
+            try:
+                while woken and len(woken) < self.batch_size:
+                    woken.append(self._wake.get(timeout=max(deadline - time.monotonic(), 0)))
+            except queue.Empty:
+                pass
+            try:
+                while self._apply_batch() == self.batch_size:
+                    pass
+            except Exception:
+                logger.exception("Could not read pending credits")
+                self._conn.rollback()
+            finally:
+                for _ in woken:
+                    self._wake.task_done()
+
+    @span("webhook.apply_batch")
+    def _apply_batch(self):
+        """Credit up to batch_size due events; returns how many were attempted."""
+        now = time.time()
+        rows = self._conn.execute(
+            "SELECT event_id, user_id, tokens, attempts FROM pending_credits"
+            " WHERE next_attempt <= ? ORDER BY rowid LIMIT ?",
+            (now, self.batch_size),
+        ).fetchall()
+        if not rows:
+            return 0
+        today = datetime.now().date().isoformat()
+        self._conn.execute("BEGIN")
+        for event_id, user_id, tokens, attempts in rows:
+            self._conn.execute("SAVEPOINT credit")
+            try:
+                self._credit(event_id, user_id, tokens, today)
+            except Exception as e:
+                logger.exception("Could not credit %s tokens to %s (event %s, attempt %d)",
+                                 tokens, user_id, event_id, attempts + 1)
+                self._conn.execute("ROLLBACK TO credit")
+                delay = min(self.max_delay, self.base_delay * 2 ** attempts)
+                self._conn.execute(
+                    "UPDATE pending_credits SET attempts = attempts + 1, next_attempt = ?, last_error = ?"
+                    " WHERE event_id = ?",
+                    (now + delay, f"{type(e).__name__}: {e}", event_id),
+                )
+            self._conn.execute("RELEASE credit")
+        self._conn.commit()
+        return len(rows)
+
+    def _credit(self, event_id, user_id, tokens, today):
+        inserted = self._conn.execute(
+            "INSERT OR IGNORE INTO processed_events (event_id, type) VALUES (?, 'checkout.session.completed')",
+            (event_id,),
+        ).rowcount
+        if inserted:  # otherwise a duplicate delivery
+            self._conn.execute("""
+                INSERT INTO user_tokens (user_id, tokens_left, is_paid, last_reset)
+                VALUES (?, ?, 1, ?)
+                ON CONFLICT(user_id) DO UPDATE SET
+                    tokens_left = tokens_left + excluded.tokens_left,
+                    is_paid = 1
+            """, (user_id, tokens, today))
+        self._conn.execute("DELETE FROM pending_credits WHERE event_id = ?", (event_id,))
+
+
 app = Flask(__name__)
+credit_worker = CreditWorker()
+
+@app.route("/metrics")
+def metrics():
+    return render_prometheus(), 200, {"Content-Type": PROMETHEUS_CONTENT_TYPE}
 
 @app.route("/webhook", methods=["POST"])
+@span("webhook.handle")
 def stripe_webhook():
     payload = request.data
     sig_header = request.headers.get("Stripe-Signature")
 
     try:
-        event = stripe.Webhook.construct_event(payload, sig_header, endpoint_secret)
+        stripe.Webhook.construct_event(payload, sig_header, endpoint_secret)
     except stripe.error.SignatureVerificationError:
         return "Invalid signature", 400
+    # Read the verified payload as plain JSON; newer stripe-python objects
+    # no longer behave like dicts.
+    event = json.loads(payload)
 
     if event["type"] == "checkout.session.completed":
         session = event["data"]["object"]
         user_id = session.get("client_reference_id")
-        price_id = session["metadata"].get("price_id")
-
-        token_map = {
-            "supporter": 10,
-            "sustainer": 25,
-            "patron": 50
-        }
-        tokens = token_map.get(price_id, 0)
+        price_id = (session.get("metadata") or {}).get("price_id")
+        tokens = TOKEN_MAP.get(price_id, 0)
 
         if user_id and tokens > 0:
-            conn = sqlite3.connect("tokens.db")
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO user_tokens (user_id, tokens_left, is_paid, last_reset)
-                VALUES (?, ?, 1, ?)
-                ON CONFLICT(user_id) DO UPDATE SET
-                    tokens_left = tokens_left + excluded.tokens_left,
-                    is_paid = 1
-            """, (user_id, tokens, datetime.now().date().isoformat()))
-            conn.commit()
-            conn.close()
+            try:
+                credit_worker.submit(event["id"], user_id, tokens)
+            except Exception:
+                # Not recorded, so don't acknowledge it: Stripe will retry.
+                logger.exception("Could not record event %s", event["id"])
+                return "Could not record event", 500
 
     return "OK", 200
 